@@ -4,7 +4,13 @@ from ai.ProAi import ProAi
 from ai.RandomGameAi import RandomGameAi
 from ai.ShipPlacement import ShipPlacement
 from ai.ShipPlacingAi import ShipPlacingAi
+from ai.ShipShape import ShipShape
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Event
+import copy
+import logging
 import random
+import time
 
 from ai.BruteForceGameAi import BruteForceGameAi
 
@@ -15,14 +21,21 @@ class AiMaster:
     Possible Ai's:
         Random Ai: When a mistake should be made.
         Classic Ai: Shoots as a human would do. (checkerboard pattern, completes ships, etc)
-        BruteForce Ai: Tries all combinations of ships and shoots where a ship is in most of these combionations. As the calculations are quite heavy, it only starts when 3 Ships are left.
+        BruteForce Ai: Tries all combinations of ships and shoots where a ship is in most of these combionations. As the calculations are quite heavy, it only starts when its predicted cost fits the compute budget (at least BRUTE_FORCE_MIN_BUDGET_MS). The cost is only predicted again after BRUTE_FORCE_ESTIMATE_STEP more cells have been shot or a ship has been sunk.
         Pro Ai: Just like BruteForce, but it doesn't pay attention to whether the ships overlap and thus drastically reduce computation time. It can be used from the beginning. It won't finish ships so if this ai is used, a Classic Ai will be kept up to date so it can handle found ships. 
         ShipPlacing Ai: Places the ships on the board. It will try to minimize the blocked area.
+
+    Every shot has a compute budget. Until its deadline the BruteForce Ai keeps enumerating and the Pro Ai keeps sampling, then the best shot found so far is returned.
+
+    While a shot is in the air, its outcome can be speculated on (see speculate). The next shot is then calculated for a hit and for a miss on copies of the ais.
+    When the outcome is submitted, the copy of the other outcome is cancelled. The Pro Ai checks for that while sampling, so it stops early. The matching copy replaces the ais and getNextShot returns its shot right away.
+    Only one thread should call the methods of the AiMaster at a time.
     """
 
-    BRUTE_FORCE_SHIP_THRESHOLD = 3
+    BRUTE_FORCE_MIN_BUDGET_MS = 100
+    BRUTE_FORCE_ESTIMATE_STEP = 3
 
-    def __init__(self, boardWidth : int, boardHeight : int, chanceOfMistake : float, numShipPlacementTries : int, useProAi : bool, numShips : dict[int, int] = {2: 4, 3: 3, 4: 2, 5: 1}):
+    def __init__(self, boardWidth : int, boardHeight : int, chanceOfMistake : float, numShipPlacementTries : int, computeBudgetMs : float, numShips : dict[int, int] = {2: 4, 3: 3, 4: 2, 5: 1}, useBruteForce : bool = True, useProAi : bool = True):
         """
         Constructor of the AiMaster class.
 
@@ -31,38 +44,67 @@ class AiMaster:
             boardHeight (int): Amount of rows of the board.
             chanceOfMistake (float): Likelyhood that a random shot happens when getNextShot is called.
             numShipPlacementTries (int): How many tries should the ship Placing Ai have to minimize the blocked area.
-            useProAi (bool): Determines if the Pro Ai will be used.
+            computeBudgetMs (float): How many milliseconds a shot may take by default.
             numShips (_type_, optional): How many ships of which length are in the game. The key is the length of the ships and values is the number of that kind of ships. Defaults to {2: 4, 3: 3, 4: 2, 5: 1}.
+            useBruteForce (bool, optional): Determines if the BruteForce Ai will be used. Defaults to True.
+            useProAi (bool, optional): Determines if the Pro Ai will be used. Defaults to True.
+
+        Raises:
+            ValueError: If the board is larger than the ship masks allow. See ShipShape.MASK_STRIDE.
         """
+        if max(boardWidth, boardHeight) > ShipShape.MASK_STRIDE - 2:
+            raise ValueError(f"Boards may be at most {ShipShape.MASK_STRIDE - 2} cells wide and high")
+
         self.board = Board(boardWidth, boardHeight)
         self.chanceOfMistake = chanceOfMistake
+        self.computeBudgetMs = computeBudgetMs
         self.numShips = numShips.copy()
 
         self.shipPlacingAi = ShipPlacingAi(numShipPlacementTries, self.board, numShips)
-        self.randomAi      = RandomGameAi()
+        self.randomAi      = RandomGameAi(boardWidth, boardHeight)
         self.classicAi     = ClassicGameAi(numShips)
         self.proAi         = ProAi() if useProAi else None
-        self.bruteForceAi  = BruteForceGameAi()
+        self.bruteForceAi  = BruteForceGameAi() if useBruteForce else None
 
         self.bruteForceMode = False
+        self.__lastEstimate : tuple[int, int] = None
 
-    def getNextShot(self) -> tuple[int]:
+        self.speculationExecutor : ThreadPoolExecutor = None
+        self.__speculation : tuple[tuple[int], dict[int, tuple[Future, Event]]] = None
+        self.__speculatedBranch : Future = None
+        self.__cancelled : Event = None
+
+    def getNextShot(self, deadlineMs : float = None) -> tuple[int]:
         """
         Calculates the next shot. 
 
+        Args:
+            deadlineMs (float, optional): How many milliseconds the ais may refine the shot. If None, the compute budget is used. Defaults to None.
+
         Returns:
             tuple[int]: Next shot position / tile.
         """
+        if self.__speculatedBranch is not None:
+            branch, shot = self.__speculatedBranch.result()
+            self.__speculatedBranch = None
+            self.__adopt(branch)
+
+            # the branches never switch to the BruteForce Ai, so it is checked here for the next shot
+            self.__shouldUseBruteForce()
+            return shot
+
+        deadline = time.perf_counter() + (self.computeBudgetMs if deadlineMs is None else deadlineMs) / 1000
+
         if random.random() < self.chanceOfMistake:
             print("MISTAKE!")
-            return self.randomAi.getNextShot(self.board)
+            return self.randomAi.getNextShot()
         
         if self.__shouldUseBruteForce():
-            return self.bruteForceAi.getNextShot()
+            return self.bruteForceAi.getNextShot(deadline)
         else:
             # only do pro ai if no SHIP_LIKELY tiles are on screen
             if self.proAi is not None and not any(self.board.check(cell, Board.SHIP_LIKELY) for cell in self.board.orderedIndex()):
-                return self.proAi.getNextShot(self.board, self.classicAi.numShips)
+                return self.proAi.getNextShot(self.board, self.classicAi.numShips, deadline, self.__cancelled)
             else:
                 return self.classicAi.getNextShot(self.board)
     
@@ -74,13 +116,122 @@ class AiMaster:
             pos (tuple[int]): The x and y coordinate of the cell in question.
             state (int): The found state. Either Board.SUBMIT_SHIP or Board.SUBMIT_NO_SHIP
         """
+        if self.__speculatedBranch is not None:
+            # the speculated shot wasn't used, but the state is
+            self.__adopt(self.__speculatedBranch.result()[0])
+            self.__speculatedBranch = None
+
+        if self.__speculation is not None:
+            cell, branches = self.__speculation
+            self.__speculation = None
+
+            if (int(pos[0]), int(pos[1])) == cell:
+                # the matching branch already knows the info
+                for branchState, (branch, cancelled) in branches.items():
+                    if branchState != state:
+                        branch.cancel()
+                        cancelled.set()
+                self.__speculatedBranch = branches[state][0]
+                return
+
+            for branch, cancelled in branches.values():
+                branch.cancel()
+                cancelled.set()
+
         if self.bruteForceMode:
             self.bruteForceAi.submitInfo(pos, state)
         else:
             self.board = self.classicAi.submitInfo(pos, state, self.board)
 
+        self.randomAi.submitInfo(pos)
         self.board[pos] = state
 
+    def speculate(self, pos : tuple[int]) -> None:
+        """
+        Starts calculating the next shot for both outcomes of a shot that hasn't been submitted yet.
+
+        Every outcome gets its own copy of the ais, so the ais themselves aren't touched until the outcome is submitted. Nothing is speculated in brute force mode.
+
+        Args:
+            pos (tuple[int]): The x and y coordinate of the shot cell.
+        """
+        if self.bruteForceMode:
+            return
+
+        if self.speculationExecutor is None:
+            self.speculationExecutor = ThreadPoolExecutor(max_workers=2)
+
+        cell = (int(pos[0]), int(pos[1]))
+        branches = {}
+        for state in (Board.SHIP, Board.CHECKED_NO_SHIP):
+            fork = self.__fork()
+            branches[state] = (self.speculationExecutor.submit(self.__speculateBranch, fork, cell, state), fork.__cancelled)
+        self.__speculation = (cell, branches)
+
+    def shutdown(self) -> None:
+        """
+        Cancels a running speculation and stops its threads and the generation of the BruteForce Ai. The ais shouldn't be used afterwards.
+        """
+        if self.__speculation is not None:
+            for branch, cancelled in self.__speculation[1].values():
+                branch.cancel()
+                cancelled.set()
+
+        if self.speculationExecutor is not None:
+            self.speculationExecutor.shutdown(wait=False, cancel_futures=True)
+
+        if self.bruteForceAi is not None:
+            self.bruteForceAi.shutdown()
+
+    @staticmethod
+    def __speculateBranch(branch : 'AiMaster', pos : tuple[int], state : int) -> tuple['AiMaster', tuple[int]]:
+        """
+        Submits an outcome to a copy of the ais and calculates the next shot on it.
+
+        Args:
+            branch (AiMaster): The copy. See __fork.
+            pos (tuple[int]): The x and y coordinate of the shot cell.
+            state (int): The assumed outcome.
+
+        Returns:
+            AiMaster: The copy.
+            tuple[int]: Its next shot.
+        """
+        branch.submitInfo(pos, state)
+        return branch, branch.getNextShot()
+
+    def __fork(self) -> 'AiMaster':
+        """
+        Copies the state of all ais that a shot changes. The copy can be cancelled on its own.
+
+        The copy never switches to the BruteForce Ai, because its generation thread can't be shared. The AiMaster checks whether to switch when it adopts the copy.
+
+        Returns:
+            AiMaster: The copy.
+        """
+        fork = copy.copy(self)
+        fork.board = self.board.copy()
+        fork.randomAi = copy.deepcopy(self.randomAi)
+        fork.classicAi = copy.deepcopy(self.classicAi)
+        fork.proAi = copy.deepcopy(self.proAi)
+        fork.bruteForceAi = None
+        fork.__speculation = None
+        fork.__speculatedBranch = None
+        fork.__cancelled = Event()
+        return fork
+
+    def __adopt(self, branch : 'AiMaster') -> None:
+        """
+        Takes over the state of a speculated branch.
+
+        Args:
+            branch (AiMaster): The branch whose outcome happened.
+        """
+        self.board = branch.board
+        self.randomAi = branch.randomAi
+        self.classicAi = branch.classicAi
+        self.proAi = branch.proAi
+
     def generateShipPlacement(self) -> ShipPlacement:
         """
         Return the pre-calculated ShipPlacement.
@@ -94,28 +245,48 @@ class AiMaster:
         """
         Returns whether the BruteForce Ai should be used for a shot.
 
-        It can also kick of  its generation.
+        It can also kick of  its generation. Every cost estimate is logged at debug level with the predicted nodes and time, the budget and the chosen engine.
 
         Returns:
             bool: If the BruteForce Ai should be used for a shot.
         """
 
         # it will start using the brute force ai if t was already used or
-        # - only a certain numbers of unknown ships left AND
-        # - no SHIP_LIKELY tile is on the board
+        # - no SHIP_LIKELY tile is on the board AND
+        # - the generation is predicted to fit in the compute budget
 
         if self.bruteForceMode:
             return True
 
-        # ship count too big
-        if sum(count for (_, count) in self.classicAi.numShips.items()) > AiMaster.BRUTE_FORCE_SHIP_THRESHOLD:
+        if self.bruteForceAi is None:
             return False
         
         # ship likely tile is on the board
         if any(self.board.check(cell, Board.SHIP_LIKELY) for cell in self.board.orderedIndex()):
             return False
 
-        self.bruteForceMode = self.bruteForceAi.kickOffGeneration(self.board, self.classicAi.numShips)
+        # the board hasn't changed enough since the cost was too big the last time
+        freeCells = sum(1 for cell in self.board.orderedIndex() if self.board.check(cell, Board.NO_INFO))
+        shipsLeft = sum(self.classicAi.numShips.values())
+        if self.__lastEstimate is not None:
+            lastFreeCells, lastShipsLeft = self.__lastEstimate
+            if lastFreeCells - freeCells < AiMaster.BRUTE_FORCE_ESTIMATE_STEP and lastShipsLeft == shipsLeft:
+                return False
+
+        # predicted cost too big
+        budgetMs = max(self.computeBudgetMs, AiMaster.BRUTE_FORCE_MIN_BUDGET_MS)
+        nodes, seconds = self.bruteForceAi.estimateCost(self.board, self.classicAi.numShips, budgetMs / 1000)
+        self.__lastEstimate = (freeCells, shipsLeft)
+
+        # every estimate is logged, so secondsPerNode and the budgets can be calibrated
+        useBruteForce = seconds * 1000 <= budgetMs
+        logging.debug(f"brute force estimate: {nodes:.0f} nodes, {seconds * 1000:.1f} ms, budget {budgetMs} ms, {freeCells} free cells, {shipsLeft} ships left => {'brute force' if useBruteForce else 'classic'}")
+
+        if not useBruteForce:
+            return False
+
+        self.bruteForceAi.kickOffGeneration(self.board, self.classicAi.numShips)
+        self.bruteForceMode = True
         
         return False
     
@@ -1,15 +1,18 @@
-import random
 from typing import Generator
+from ai.CellPermutation import CellPermutation
 
 
 class Board:
     """
     Holds possible states of any cell of a board as well as stretegic states.
 
+    For every mask in FREE_RUN_MASKS it keeps track of the free runs: For every cell and direction, how many cells in a row (starting at the cell itself) are in one of the states of the mask.
+    A row and a column are recalculated if a cell changes whether it is free. So the ais can read the free space instead of stepping through the board.
+
     Attributes:
         width (int): Amount of columns.
         height (int): Amount of rows.
-        data (list[int]): All stored states
+        data (list[list[int]]): All stored states. Indexed like data[x][y].
 
     """
 
@@ -24,6 +27,18 @@ class Board:
     SUBMIT_SHIP    = SHIP
     SUBMIT_NO_SHIP = CHECKED_NO_SHIP
 
+    # cells where a ship might be
+    SHIP_POSSIBLE = NO_INFO | SHIP_LIKELY | SHIP
+
+    # masks the free runs are kept track of
+    FREE_RUN_MASKS = (NO_INFO, SHIP_POSSIBLE)
+
+    # directions of the free runs
+    RIGHT = (1, 0)
+    DOWN  = (0, 1)
+    LEFT  = (-1, 0)
+    UP    = (0, -1)
+
     def __init__(self, width : int, height : int):
         """
         Constructor of the Board class.
@@ -35,7 +50,16 @@ class Board:
         self.width = width
         self.height = height
 
-        self.data = [[Board.NO_INFO for _ in range(width)] for _ in range(height)]
+        # columns first, so data[x][y] is the cell (x, y)
+        self.data = [[Board.NO_INFO for _ in range(height)] for _ in range(width)]
+
+        # free runs by mask and direction. Indexed like data
+        self.__freeRuns = { mask: { direction: [[0 for _ in range(height)] for _ in range(width)] for direction in (Board.RIGHT, Board.DOWN, Board.LEFT, Board.UP) } for mask in Board.FREE_RUN_MASKS }
+        for mask in Board.FREE_RUN_MASKS:
+            for y in range(height):
+                self.__updateRowRuns(mask, y)
+            for x in range(width):
+                self.__updateColumnRuns(mask, x)
     
     def __getitem__(self, cell : tuple[int]) -> int:
         """
@@ -57,7 +81,100 @@ class Board:
             cell (tuple[int]): x and y coordinate of the cell
             newVal (int): New state of the specified cell
         """
-        self.data[cell[0]][cell[1]] = newVal
+        x, y = cell[0], cell[1]
+        oldVal = self.data[x][y]
+        self.data[x][y] = newVal
+
+        for mask in Board.FREE_RUN_MASKS:
+            if bool(oldVal & mask) != bool(newVal & mask):
+                self.__updateRowRuns(mask, y)
+                self.__updateColumnRuns(mask, x)
+
+    def copy(self) -> 'Board':
+        """
+        Creates a copy of itself. Including the free runs.
+
+        Returns:
+            Board: Newly created copy.
+        """
+        cpy = Board.__new__(Board)
+        cpy.width = self.width
+        cpy.height = self.height
+        cpy.data = [ column.copy() for column in self.data ]
+        cpy.__freeRuns = { mask: { direction: [ column.copy() for column in runs ] for direction, runs in byDirection.items() } for mask, byDirection in self.__freeRuns.items() }
+        return cpy
+
+    def freeRun(self, cell : tuple[int], direction : tuple[int], mask : int = SHIP_POSSIBLE) -> int:
+        """
+        Returns how many cells in a row, starting at the cell itself, are in one of the states of the mask.
+
+        Args:
+            cell (tuple[int]): x and y coordinate of the first cell.
+            direction (tuple[int]): Either RIGHT, DOWN, LEFT or UP.
+            mask (int, optional): One of FREE_RUN_MASKS. Defaults to SHIP_POSSIBLE.
+
+        Returns:
+            int: Length of the free run. 0 if the cell is not free or out of bounds.
+        """
+        if not self.isInBounds(cell):
+            return 0
+        return self.__freeRuns[mask][(int(direction[0]), int(direction[1]))][cell[0]][cell[1]]
+
+    def freeRuns(self, direction : tuple[int], mask : int = SHIP_POSSIBLE) -> list[list[int]]:
+        """
+        Returns the free runs of all cells. See freeRun. The result is indexed like data and must not be changed.
+
+        Args:
+            direction (tuple[int]): Either RIGHT, DOWN, LEFT or UP.
+            mask (int, optional): One of FREE_RUN_MASKS. Defaults to SHIP_POSSIBLE.
+
+        Returns:
+            list[list[int]]: The free runs.
+        """
+        return self.__freeRuns[mask][direction]
+
+    def __updateRowRuns(self, mask : int, y : int) -> None:
+        """
+        Recalculates the horizontal free runs of a row.
+
+        Args:
+            mask (int): One of FREE_RUN_MASKS.
+            y (int): The row.
+        """
+        runs = self.__freeRuns[mask]
+        right, left = runs[Board.RIGHT], runs[Board.LEFT]
+
+        run = 0
+        for x in range(self.width - 1, -1, -1):
+            run = run + 1 if self.data[x][y] & mask else 0
+            right[x][y] = run
+
+        run = 0
+        for x in range(self.width):
+            run = run + 1 if self.data[x][y] & mask else 0
+            left[x][y] = run
+
+    def __updateColumnRuns(self, mask : int, x : int) -> None:
+        """
+        Recalculates the vertical free runs of a column.
+
+        Args:
+            mask (int): One of FREE_RUN_MASKS.
+            x (int): The column.
+        """
+        runs = self.__freeRuns[mask]
+        down, up = runs[Board.DOWN][x], runs[Board.UP][x]
+        column = self.data[x]
+
+        run = 0
+        for y in range(self.height - 1, -1, -1):
+            run = run + 1 if column[y] & mask else 0
+            down[y] = run
+
+        run = 0
+        for y in range(self.height):
+            run = run + 1 if column[y] & mask else 0
+            up[y] = run
     
     def check(self, cell : tuple[int], value : int) -> bool:
         """
@@ -88,14 +205,12 @@ class Board:
 
     def shuffledIndex(self) -> Generator[tuple[int], None, None]:
         """
-        Enables to loop through all cells in the board randomly.
+        Enables to loop through all cells in the board randomly. Every order is equally likely. See CellPermutation.shuffled.
 
         Yields:
             Generator[tuple[int], None, None]: All cells on the board in a random order.
         """
-        for y in random.sample(list(range(self.height)), self.height):
-            for x in random.sample(list(range(self.width)), self.width):
-                yield (x, y)
+        return CellPermutation.shuffled(self.width, self.height)
     
     def orderedIndex(self) -> Generator[tuple[int], None, None]:
         """
@@ -104,9 +219,7 @@ class Board:
         Yields:
             Generator[tuple[int], None, None]: All cells on the board in order.
         """
-        for y in range(self.height):
-            for x in range(self.width):
-                yield (x, y)
+        return iter(CellPermutation.ordered(self.width, self.height))
 
     def print(self) -> None:
         """
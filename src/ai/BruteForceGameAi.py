@@ -1,63 +1,209 @@
 from ai.Board import Board
 from ai.ShipPlacement import ShipPlacement
 from ai.ShipShape import ShipShape
+from typing import Generator
+import numpy as np
 import random
-from threading import Thread
+import time
+from threading import Event, Lock, Thread
 
 
 class BruteForceGameAi:
     """
     To calculate the next shot it tries all valid ship placements and selects the most likely tile.
+
+    Every distinct placement is only counted once. Ships of the same length are placed in the order of the possible ship locations, so their permutations aren't enumerated. Placements that are found twice anyway are skipped.
+
+    For every cell it is counted in how many placements it is occupied. The counts are stored in a numpy array. New placements are collected and added in batches of BATCH_SIZE by unpacking their occupied masks (see ShipShape.cellBit).
+
+    How long the generation will take can be predicted with estimateCost before it is kicked off. The prediction is calibrated by every finished generation.
+
+    The generation runs on its own thread and shots can be taken before it is done. Infos submitted in the meantime are remembered as masks of hit and missed cells, so placements that are found later and don't match them are dropped right away.
+
+    Attributes:
+        possiblePlacements (set[ShipPlacement]): All placements that are still possible.
+        cellPropabilities (np.ndarray): In how many possible placements a cell is occupied. It has the shape (width, height).
+        closedCells (np.ndarray): Marks the cells that mustn't be shot. It has the shape (width, height).
     """
 
-    MAX_POSSIBLE_SHIP_LOCATIONS = 16
+    POLL_INTERVAL = 0.005
+    BATCH_SIZE = 256
+
+    # cost model
+    ESTIMATE_PROBES = 32
+    CALIBRATION_WEIGHT = 0.3
+    secondsPerNode = 20e-6
 
     def __init__(self):
         """
         The constructor of the BruteForceGameAi class.
         """
         self.possiblePlacements : set[ShipPlacement] = None
-        self.cellPropabilities = {}
+        self.cellPropabilities : np.ndarray = None
+        self.closedCells : np.ndarray = None
         self.generateThread = None
 
+        self.__pendingMasks : list[int] = []
+        self.__lock = Lock()
+        self.__nodeCount = 0
+        self.__stopped = Event()
+
+        # cells submitted since the generation was kicked off. See ShipShape.cellBit
+        self.__hitMask = 0
+        self.__missMask = 0
+
         self.submitInfoQueue = set()
 
     
-    def kickOffGeneration(self, board : Board, numShipsLeft : dict[int, int]) -> bool:
+    def estimateCost(self, board : Board, numShipsLeft : dict[int, int], maxSeconds : float = None) -> tuple[float, float]:
         """
-        Kicks off the generation of all possible ship placements. Abords if there are propabably to many to handle.
+        Predicts how many recursion steps the generation takes and how long that will be.
+
+        It uses Knuth's estimator: ESTIMATE_PROBES random paths are walked down the recursion tree. On every path, the product of the numbers of children seen so far estimates the number of nodes on that level.
+        The time is predicted with secondsPerNode.
 
         Args:
             board (Board): The current board state
             numShipsLeft (dict[int, int]):  How many ships of which length are left to place. The key is the length of the ships and values is the number of that kind of ships.
+            maxSeconds (float, optional): If the prediction will be longer for sure, the estimation stops early and infinity is returned. Defaults to None.
 
         Returns:
-            bool: Whether the creation will be successfull.
+            float: Predicted number of recursion steps.
+            float: Predicted time in seconds.
+        """
+        possibleShipLocations = self.__getAllPossibleShipLocations(board)
+        shipsToDo = BruteForceGameAi.__shipsToDo(numShipsLeft)
+        maxNodes = float("inf") if maxSeconds is None else maxSeconds / BruteForceGameAi.secondsPerNode
+
+        totalNodes = 0.
+        for _ in range(BruteForceGameAi.ESTIMATE_PROBES):
+            placement = ShipPlacement()
+            firstLocation = 0
+            levelNodes = 1.
+
+            totalNodes += levelNodes
+            for depth, length in enumerate(shipsToDo):
+                children = list(self.__candidateShips(length, placement, possibleShipLocations, board, firstLocation))
+                if len(children) == 0:
+                    break
+
+                levelNodes *= len(children)
+                totalNodes += levelNodes
+
+                # the average can't get below the limit anymore
+                if totalNodes > maxNodes * BruteForceGameAi.ESTIMATE_PROBES:
+                    return float("inf"), float("inf")
+
+                i, ship = random.choice(children)
+                placement.add(ship)
+                firstLocation = i + 1 if depth + 1 < len(shipsToDo) and shipsToDo[depth + 1] == length else 0
+
+        nodes = totalNodes / BruteForceGameAi.ESTIMATE_PROBES
+        return nodes, nodes * BruteForceGameAi.secondsPerNode
+
+    def kickOffGeneration(self, board : Board, numShipsLeft : dict[int, int]) -> None:
+        """
+        Kicks off the generation of all possible ship placements. If it might take too long, check estimateCost first.
+
+        When the generation is done, the measured time per recursion step calibrates secondsPerNode.
+
+        Args:
+            board (Board): The current board state
+            numShipsLeft (dict[int, int]):  How many ships of which length are left to place. The key is the length of the ships and values is the number of that kind of ships.
         """
         self.possiblePlacements = set()
+        self.cellPropabilities = np.zeros((board.width, board.height), dtype=np.int64)
+        self.closedCells = np.array(board.data, dtype=np.int32) != Board.NO_INFO
+        self.__pendingMasks = []
+        self.__nodeCount = 0
+        self.__hitMask = 0
+        self.__missMask = 0
+
+        # the board keeps changing while the thread runs
+        board = board.copy()
 
         possibleShipLocations = self.__getAllPossibleShipLocations(board)
         print(f"Possible Ship Locations: {len(possibleShipLocations)}")
 
-        if len(possibleShipLocations) > BruteForceGameAi.MAX_POSSIBLE_SHIP_LOCATIONS:
-            return False
-
-        shipsToDo : list[int] = []
-        for length, count in sorted(numShipsLeft.items(), reverse=True):
-            shipsToDo += [ length ] * count
+        shipsToDo = BruteForceGameAi.__shipsToDo(numShipsLeft)
         
         def threadFun():
             print("Start generating values for the brute force ai")
-            self.__generatePossiblePlacements(shipsToDo, ShipPlacement(), possibleShipLocations, board)
-            print("Done generating values for the brute force ai")
+            startTime = time.perf_counter()
+
+            self.__generatePossiblePlacements(shipsToDo, ShipPlacement(), possibleShipLocations, board, 0)
+            with self.__lock:
+                self.__flushPendingMasks()
+
+            duration = time.perf_counter() - startTime
+            if self.__stopped.is_set():
+                print(f"Stopped generating values for the brute force ai after {self.__nodeCount} nodes")
+                return
+
+            measured = duration / max(self.__nodeCount, 1)
+            BruteForceGameAi.secondsPerNode += BruteForceGameAi.CALIBRATION_WEIGHT * (measured - BruteForceGameAi.secondsPerNode)
+            print(f"Done generating values for the brute force ai: {self.__nodeCount} nodes in {duration * 1000:.1f}ms ({measured * 1e6:.1f}us per node)")
 
         self.generateThread = Thread(target=threadFun)
         self.generateThread.daemon = True
         self.generateThread.start()
 
-        return True
+    def shutdown(self) -> None:
+        """
+        Stops a running generation and waits for its thread. The placements found so far stay, but no more are added.
+        """
+        self.__stopped.set()
+        if self.generateThread is not None:
+            self.generateThread.join()
+
+    @staticmethod
+    def __shipsToDo(numShipsLeft : dict[int, int]) -> list[int]:
+        """
+        Lists the ship lengths in the order they are placed. Longest first.
 
-    def __generatePossiblePlacements(self, shipsToDo : list[int], crntPlacement : ShipPlacement, possibleShipLocations : list[tuple[int]], board : Board):
+        Args:
+            numShipsLeft (dict[int, int]):  How many ships of which length are left to place.
+
+        Returns:
+            list[int]: One length per ship.
+        """
+        shipsToDo : list[int] = []
+        for length, count in sorted(numShipsLeft.items(), reverse=True):
+            shipsToDo += [ length ] * count
+        return shipsToDo
+
+    def __candidateShips(self, length : int, crntPlacement : ShipPlacement, possibleShipLocations : list[tuple[int]], board : Board, firstLocation : int) -> Generator[tuple[int, ShipShape], None, None]:
+        """
+        Yields all ships of a length that can be added to a placement.
+
+        Args:
+            length (int): Length of the ship.
+            crntPlacement (ShipPlacement): Placement of all the ships that allready have been placed.
+            possibleShipLocations (list[tuple[int]]): All possible tiles where a ship can be.
+            board (Board): The current state of the board.
+            firstLocation (int): Index of the first location in possibleShipLocations the ship may start at.
+
+        Yields:
+            Generator[tuple[int, ShipShape], None, None]: The index of the ship's location and the ship.
+        """
+        for i in range(firstLocation, len(possibleShipLocations)):
+            x, y = possibleShipLocations[i]
+            orientations = random.sample([ ShipShape.VERTICAL, ShipShape.HORIZONTAL ], 2)
+            for orientation in orientations:
+                # check if it is on the board and matches the boards requirements
+                direction = Board.RIGHT if orientation == ShipShape.HORIZONTAL else Board.DOWN
+                if board.freeRun((x, y), direction, Board.NO_INFO) < length:
+                    continue
+
+                tempShip = ShipShape(length, (x, y), orientation)
+
+                # check if it fits in the ship placement
+                if not crntPlacement.fitsIn(tempShip):
+                    continue
+
+                yield i, tempShip
+
+    def __generatePossiblePlacements(self, shipsToDo : list[int], crntPlacement : ShipPlacement, possibleShipLocations : list[tuple[int]], board : Board, firstLocation : int):
         """
         Recursively generates all possible ship placaments.
 
@@ -66,33 +212,24 @@ class BruteForceGameAi:
             crntPlacement (ShipPlacement): Placement of all the ships that allready have been placed.
             possibleShipLocations (list[tuple[int]]): All possible tiles where a ship can be.
             board (Board): The current state of the board.
+            firstLocation (int): Index of the first location in possibleShipLocations the next ship may start at. Used so ships of the same length are only placed in one order.
         """
+        self.__nodeCount += 1
+
+        if self.__stopped.is_set():
+            return
+
         if len(shipsToDo) == 0:
             self.__submitPossibleShipPlacement(crntPlacement)
             return
         
         crntLength = shipsToDo.pop(0)
+        sameLengthNext = len(shipsToDo) > 0 and shipsToDo[0] == crntLength
 
-        for (x, y) in possibleShipLocations:
-            orientations = random.sample([ ShipShape.VERTICAL, ShipShape.HORIZONTAL ], 2)
-            for orientation in orientations:
-                tempShip = ShipShape(crntLength, (x, y), orientation)
-
-                # is the ship on the board
-                if not tempShip.isInBoardBounds(board.width, board.height):
-                    continue
-
-                # check if it matches the boards requirements
-                if not all(board.check(tile, Board.NO_INFO) for tile in tempShip.occupiedTiles()):
-                    continue
-            
-                # check if it fits in the ship placement
-                if not crntPlacement.fitsIn(tempShip):
-                    continue
-                
-                tempPlacement = crntPlacement.copy()
-                tempPlacement.add(tempShip)
-                self.__generatePossiblePlacements(shipsToDo.copy(), tempPlacement, possibleShipLocations, board)
+        for i, tempShip in self.__candidateShips(crntLength, crntPlacement, possibleShipLocations, board, firstLocation):
+            tempPlacement = crntPlacement.copy()
+            tempPlacement.add(tempShip)
+            self.__generatePossiblePlacements(shipsToDo.copy(), tempPlacement, possibleShipLocations, board, i + 1 if sameLengthNext else 0)
 
     def __getAllPossibleShipLocations(self, board : Board) -> list[tuple[int]]:
         """
@@ -104,27 +241,67 @@ class BruteForceGameAi:
         Returns:
             list[tuple[int]]: All possible tiles where a ship can be.
         """
-        return [ (x, y) for x, y in board.orderedIndex() if board.check((x, y), Board.NO_INFO) and (board.check((x+1, y), Board.NO_INFO) or board.check((x, y+1), Board.NO_INFO)) ]
+        return [ cell for cell in board.orderedIndex() if board.freeRun(cell, Board.RIGHT, Board.NO_INFO) >= 2 or board.freeRun(cell, Board.DOWN, Board.NO_INFO) >= 2 ]
 
     def __submitPossibleShipPlacement(self, placement : ShipPlacement) -> None:
         """
-        Adds placement to the list and updates all cells total.
+        Adds placement to the list and updates all cells total. Placements that are already in the list or don't match the submitted infos are skipped.
 
         Args:
             placement (ShipPlacement): Placement to be added.
         """
-        self.possiblePlacements.add(placement)
-        
-        for cell in placement.occupiedCells():
-            if cell in self.cellPropabilities:
-                self.cellPropabilities[cell] += 1
-            else:
-                self.cellPropabilities[cell] = 1
+        with self.__lock:
+            mask = placement.occupiedMask
+            if mask & self.__missMask or mask & self.__hitMask != self.__hitMask:
+                return
+
+            if placement in self.possiblePlacements:
+                return
+
+            self.possiblePlacements.add(placement)
+            self.__pendingMasks.append(placement.occupiedMask)
+
+            if len(self.__pendingMasks) >= BruteForceGameAi.BATCH_SIZE:
+                self.__flushPendingMasks()
+
+    def __flushPendingMasks(self) -> None:
+        """
+        Adds the collected placements to the cell counts. The lock has to be held.
+        """
+        if self.__pendingMasks:
+            self.cellPropabilities += self.__masksToCounts(self.__pendingMasks)
+            self.__pendingMasks = []
+
+    def __masksToCounts(self, masks : list[int]) -> np.ndarray:
+        """
+        Counts for every cell in how many of the masks it is set.
+
+        Args:
+            masks (list[int]): Occupied masks of placements. See ShipShape.cellBit.
+
+        Returns:
+            np.ndarray: The counts of shape (width, height).
+        """
+        width, height = self.cellPropabilities.shape
+        rowCount = height + 2
+        size = rowCount * ShipShape.MASK_STRIDE // 8
+
+        buffer = b"".join(mask.to_bytes(size, "little") for mask in masks)
+        bits = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8), bitorder="little")
+        bits = bits.reshape(len(masks), rowCount, ShipShape.MASK_STRIDE)[:, 1:height + 1, 1:width + 1]
+
+        return bits.sum(axis=0, dtype=np.int64).T
     
-    def getNextShot(self):
+    def getNextShot(self, deadline : float = None) -> tuple[int]:
         """
         Calculates the next shot. 
 
+        If the generation is still running, it waits for it until the deadline and uses the placements found so far. If none have been found yet, it waits until the first ones are there.
+        The counts are copied while the lock is held, so the generation can go on in the meantime.
+
+        Args:
+            deadline (float, optional): Until when (time.perf_counter) to wait for the generation. If None, it waits until the generation is done. Defaults to None.
+
         Raises:
             RuntimeError: If the generation hasnt been kicked off yet.
 
@@ -134,50 +311,44 @@ class BruteForceGameAi:
         if self.generateThread is None:
             raise RuntimeError("The Brute Force Ai hasnt been started yet so it cannot advice a shot position")
 
+        self.generateThread.join(None if deadline is None else max(deadline - time.perf_counter(), 0))
+        while len(self.possiblePlacements) == 0 and self.generateThread.is_alive():
+            self.generateThread.join(BruteForceGameAi.POLL_INTERVAL)
+
         print("get next shot from brute force")
-        bestCell = (-1, -1)
-        bestProp = -1
+        with self.__lock:
+            self.__flushPendingMasks()
+            propabilities = np.where(self.closedCells, -1, self.cellPropabilities)
 
-        for cell, prop in self.cellPropabilities.items():
-            if prop > bestProp:
-                bestCell = cell
-                bestProp = prop
-        
-        return bestCell
+        x, y = np.unravel_index(np.argmax(propabilities), propabilities.shape)
+        return (int(x), int(y))
 
     
     def submitInfo(self, pos : tuple[int], state : int) -> None:
         """
         Submits and forwards a new cell information to the ais.
 
+        It doesn't wait for the generation. The placements found so far that don't match the info are removed, the ones found later are filtered.
+
         Args:
             pos (tuple[int]): The x and y coordinate of the cell in question.
             state (int): The found state. Either Board.SUBMIT_SHIP or Board.SUBMIT_NO_SHIP
         """
-        if self.generateThread is not None:
-            self.generateThread.join()
-
         isHit = state == Board.SHIP
-        toRemove = { placement for placement in self.possiblePlacements if placement.cellOccupied(pos) != isHit }
+        bit = ShipShape.cellBit(pos)
 
-        for placement in toRemove:
-            self.__removePossibleShipPlacement(placement)
-        
-        # shouldnt be able to shoot it again
-        if pos in self.cellPropabilities:
-            del self.cellPropabilities[pos]
-
-    def __removePossibleShipPlacement(self, placement : ShipPlacement) -> None:
-        """
-        Removes placement from the list and updates all cells total.
+        with self.__lock:
+            if isHit:
+                self.__hitMask |= bit
+            else:
+                self.__missMask |= bit
 
-        Args:
-            placement (ShipPlacement): Placement to be removed.
-        """
-        for cell in placement.occupiedCells():
-            if cell in self.cellPropabilities:
-                self.cellPropabilities[cell] -= 1
-        
-        self.possiblePlacements.remove(placement)
+            self.__flushPendingMasks()
+            toRemove = [ placement for placement in self.possiblePlacements if bool(placement.occupiedMask & bit) != isHit ]
 
+            if toRemove:
+                self.cellPropabilities -= self.__masksToCounts([ placement.occupiedMask for placement in toRemove ])
+                self.possiblePlacements.difference_update(toRemove)
 
+            # shouldnt be able to shoot it again
+            self.closedCells[pos[0], pos[1]] = True
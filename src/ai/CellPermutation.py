@@ -0,0 +1,58 @@
+from typing import Generator
+import random
+
+
+class CellPermutation:
+    """
+    Hands out the cells of a board in order or in a uniformly random order without allocating new lists on every call.
+
+    The ordered cells are cached per board size. For random orders, buffers holding the cells are reused. A buffer is shuffled lazily with the Fisher-Yates algorithm: the next cell is only drawn when it is requested. So a loop that stops early only pays for the cells it used.
+
+    Every running iteration gets its own buffer, so iterations can be nested.
+    """
+
+    __orderedCells : dict[tuple[int], tuple[tuple[int]]] = {}
+    __freeBuffers : dict[tuple[int], list[list[tuple[int]]]] = {}
+
+    @staticmethod
+    def ordered(width : int, height : int) -> tuple[tuple[int]]:
+        """
+        Returns all cells of a board in order. Row by row.
+
+        Args:
+            width (int): Amount of columns.
+            height (int): Amount of rows.
+
+        Returns:
+            tuple[tuple[int]]: All cells of the board.
+        """
+        cells = CellPermutation.__orderedCells.get((width, height))
+        if cells is None:
+            cells = tuple((x, y) for y in range(height) for x in range(width))
+            CellPermutation.__orderedCells[(width, height)] = cells
+        return cells
+
+    @staticmethod
+    def shuffled(width : int, height : int) -> Generator[tuple[int], None, None]:
+        """
+        Yields all cells of a board in a uniformly random order.
+
+        Args:
+            width (int): Amount of columns.
+            height (int): Amount of rows.
+
+        Yields:
+            Generator[tuple[int], None, None]: All cells of the board in a random order.
+        """
+        freeBuffers = CellPermutation.__freeBuffers.setdefault((width, height), [])
+        buffer = freeBuffers.pop() if freeBuffers else list(CellPermutation.ordered(width, height))
+
+        try:
+            # the buffer always holds a permutation of the cells, so shuffling it again is uniform
+            count = len(buffer)
+            for i in range(count):
+                j = i + int(random.random() * (count - i))
+                buffer[i], buffer[j] = buffer[j], buffer[i]
+                yield buffer[i]
+        finally:
+            freeBuffers.append(buffer)
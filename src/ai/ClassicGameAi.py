@@ -51,12 +51,8 @@ class ClassicGameAi:
                     raise RuntimeError("No ship tile adjacent to a ship likely tile")
                 shipTile = shipTile[0]
 
-                freeSpace = 0
-                posArray = np.array(pos)
-                direction = posArray - np.array(shipTile)
-
-                while self.shipIsPossible(posArray + freeSpace * direction, board):
-                    freeSpace += 1
+                direction = (pos[0] - shipTile[0], pos[1] - shipTile[1])
+                freeSpace = board.freeRun(pos, direction)
 
                 # save result
                 freeSpaceByTile[pos] = freeSpace
@@ -139,8 +135,11 @@ class ClassicGameAi:
                     length, lastShipTile = self.countShipLength(shipTile, board)
                     if length == 1:
                         # found the second tile
-                        # remove orthogonal ship likely tiles
-                        board = self.replaceAdjacentCells(pos, Board.SHIP_LIKELY, Board.DEDUSED_NO_SHIP, board, True)
+                        # remove orthogonal ship likely tiles. The tile ahead stays, it can be ship likely because of a ship tile that was found by a random shot
+                        aheadTile = (2 * pos[0] - shipTile[0], 2 * pos[1] - shipTile[1])
+                        for tile in self.findAdjacentTilesByState(pos, Board.SHIP_LIKELY, board, True):
+                            if tile != aheadTile:
+                                board[tile] = Board.DEDUSED_NO_SHIP
                         board[pos] = Board.SHIP
                     
                     if length + 1 == self.currentLongestShip():
@@ -10,14 +10,20 @@ class Difficulties:
     Static class to hold the selected difficultie and its properties.
     """
 
+    __names = [ "Käpt'n Blaubär", "Captain Hook", "Die Wilde 13", "Jack Sparrow" ]
     __nameImages = [ 'texts.kaptnBlaubar', 'texts.captainHook', 'texts.dieWilde13', 'texts.jackSparrow' ]
     __descriptionImages = [ 'texts.kb_des', 'texts.ch_des', 'texts.w13_des', 'texts.js_des' ]
     __chancesOfMistake = [ 0.4, 0.2, 0.01, 0.0 ]
+    __computeBudgetsMs = [ 50, 100, 150, 250 ]
     __useProAi = [ False, False, False, True ]
     __numShipPlacementTries = [ 1, 1, 2, 4 ]
     __selectedIndex = 0
 
 
+    @staticmethod
+    def allNames() -> list[str]:
+        return Difficulties.__names
+
     @staticmethod
     def allNameImages() -> list[str]:
         return Difficulties.__nameImages
@@ -40,12 +46,34 @@ class Difficulties:
 
     @staticmethod
     def getSelectedChanceOfMistake() -> float:
-        return Difficulties.__chancesOfMistake[Difficulties.__selectedIndex]
+        return Difficulties.getChanceOfMistake(Difficulties.__selectedIndex)
     
     @staticmethod
     def getSelectedNumShipPlacementTries() -> int:
-        return Difficulties.__numShipPlacementTries[Difficulties.__selectedIndex]
+        return Difficulties.getNumShipPlacementTries(Difficulties.__selectedIndex)
+    
+    @staticmethod
+    def getSelectedComputeBudgetMs() -> float:
+        return Difficulties.getComputeBudgetMs(Difficulties.__selectedIndex)
     
     @staticmethod
-    def doesSelecteduseProAi() -> bool:
-        return Difficulties.__useProAi[Difficulties.__selectedIndex]
\ No newline at end of file
+    def doesSelectedUseProAi() -> bool:
+        return Difficulties.doesUseProAi(Difficulties.__selectedIndex)
+
+
+
+    @staticmethod
+    def getChanceOfMistake(index : int) -> float:
+        return Difficulties.__chancesOfMistake[index]
+
+    @staticmethod
+    def getNumShipPlacementTries(index : int) -> int:
+        return Difficulties.__numShipPlacementTries[index]
+
+    @staticmethod
+    def getComputeBudgetMs(index : int) -> float:
+        return Difficulties.__computeBudgetsMs[index]
+
+    @staticmethod
+    def doesUseProAi(index : int) -> bool:
+        return Difficulties.__useProAi[index]
\ No newline at end of file
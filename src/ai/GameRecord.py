@@ -0,0 +1,179 @@
+from typing import Generator
+import struct
+from ai.Board import Board
+from ai.ShipPlacement import ShipPlacement
+
+
+class GameRecord:
+    """
+    Compact binary record of one game.
+
+    The two fleets are stored as bit masks over the board and every shot is packed into 2 bytes.
+
+    Binary layout (little endian):
+        header: version (u8), width (u8), height (u8), winner (u8), number of shots (u16)
+        fleets: 2 masks with (width * height + 7) // 8 bytes each. Bit x + y * width is set if a ship occupies the cell (x, y).
+        shots: u16 per shot. Bits 0-13 are the cell index x + y * width, bit 14 is the shooting player and bit 15 is set on a hit.
+
+    Attributes:
+        width (int): Amount of columns of the board.
+        height (int): Amount of rows of the board.
+        fleets (list[int]): Fleet masks of both players. Player 0 is the player, player 1 the computer.
+        shots (list[int]): All packed shots in the order they happened.
+        winner (int): The player that won or NO_WINNER.
+    """
+
+    VERSION = 1
+    HEADER = struct.Struct("<BBBBH")
+
+    PLAYER_BIT = 1 << 14
+    HIT_BIT    = 1 << 15
+    CELL_MASK  = PLAYER_BIT - 1
+
+    NO_WINNER = 255
+
+    def __init__(self, width : int, height : int):
+        """
+        Constructor of the GameRecord class.
+
+        Args:
+            width (int): Amount of columns of the board.
+            height (int): Amount of rows of the board.
+        """
+        self.width = width
+        self.height = height
+        self.fleets = [ 0, 0 ]
+        self.shots : list[int] = []
+        self.winner = GameRecord.NO_WINNER
+
+    def setFleet(self, player : int, placement : ShipPlacement) -> None:
+        """
+        Stores the ship placement of a player as mask.
+
+        Args:
+            player (int): 0 for the player, 1 for the computer.
+            placement (ShipPlacement): The player's ships.
+        """
+        mask = 0
+        for (x, y) in placement.occupiedCells():
+            mask |= 1 << (x + y * self.width)
+        self.fleets[player] = mask
+
+    def addShot(self, player : int, cell : tuple[int], hit : bool) -> None:
+        """
+        Appends a shot.
+
+        Args:
+            player (int): The shooting player.
+            cell (tuple[int]): The cell that was shot at.
+            hit (bool): Whether a ship was hit.
+        """
+        packed = int(cell[0]) + int(cell[1]) * self.width
+        if player:
+            packed |= GameRecord.PLAYER_BIT
+        if hit:
+            packed |= GameRecord.HIT_BIT
+        self.shots.append(packed)
+
+    def setWinner(self, player : int) -> None:
+        """
+        Sets the player that won the game.
+
+        Args:
+            player (int): The winning player.
+        """
+        self.winner = player
+
+    def fleetCells(self, player : int) -> Generator[tuple[int], None, None]:
+        """
+        Yields all cells occupied by the fleet of a player.
+
+        Args:
+            player (int): 0 for the player, 1 for the computer.
+
+        Yields:
+            Generator[tuple[int], None, None]: All occupied cells.
+        """
+        mask = self.fleets[player]
+        for index in range(self.width * self.height):
+            if mask >> index & 1:
+                yield (index % self.width, index // self.width)
+
+    def shotsOf(self, player : int = None) -> Generator[tuple[tuple[int], bool], None, None]:
+        """
+        Yields the shots in the order they happened.
+
+        Args:
+            player (int, optional): Only yield the shots of this player. If None, all shots are yielded. Defaults to None.
+
+        Yields:
+            Generator[tuple[tuple[int], bool], None, None]: The cell and whether it was a hit.
+        """
+        for packed in self.shots:
+            if player is not None and bool(packed & GameRecord.PLAYER_BIT) != bool(player):
+                continue
+            index = packed & GameRecord.CELL_MASK
+            yield (index % self.width, index // self.width), bool(packed & GameRecord.HIT_BIT)
+
+    def replay(self, ai, player : int = 1) -> Generator[tuple[tuple[int], tuple[int]], None, None]:
+        """
+        Replays the recorded shots of a player against an ai.
+
+        For every recorded shot, the ai is asked for its next shot first. Then the recorded shot and its outcome are submitted. So the ai always sees the recorded game, no matter what it would have shot.
+
+        Args:
+            ai (AiMaster): A fresh ai for the same board size.
+            player (int, optional): Whose shots should be replayed. Defaults to 1.
+
+        Yields:
+            Generator[tuple[tuple[int], tuple[int]], None, None]: The recorded shot and the ai's shot.
+        """
+        for cell, hit in self.shotsOf(player):
+            aiCell = ai.getNextShot()
+            yield cell, (int(aiCell[0]), int(aiCell[1]))
+            ai.submitInfo(cell, Board.SHIP if hit else Board.CHECKED_NO_SHIP)
+
+    def toBytes(self) -> bytes:
+        """
+        Encodes the record.
+
+        Returns:
+            bytes: The binary record.
+        """
+        maskSize = (self.width * self.height + 7) // 8
+        return b"".join([
+            GameRecord.HEADER.pack(GameRecord.VERSION, self.width, self.height, self.winner, len(self.shots)),
+            self.fleets[0].to_bytes(maskSize, "little"),
+            self.fleets[1].to_bytes(maskSize, "little"),
+            struct.pack(f"<{len(self.shots)}H", *self.shots)
+        ])
+
+    @classmethod
+    def fromBytes(cls, buffer : bytes | memoryview) -> 'GameRecord':
+        """
+        Decodes a record.
+
+        Args:
+            buffer (bytes | memoryview): The binary record. See toBytes.
+
+        Raises:
+            ValueError: If the record has an unknown version.
+
+        Returns:
+            GameRecord: The decoded record.
+        """
+        version, width, height, winner, shotCount = GameRecord.HEADER.unpack_from(buffer, 0)
+        if version != GameRecord.VERSION:
+            raise ValueError(f"Unknown game record version {version}")
+
+        record = cls(width, height)
+        record.winner = winner
+
+        offset = GameRecord.HEADER.size
+        maskSize = (width * height + 7) // 8
+        for player in range(2):
+            record.fleets[player] = int.from_bytes(buffer[offset:offset + maskSize], "little")
+            offset += maskSize
+
+        record.shots = list(struct.unpack_from(f"<{shotCount}H", buffer, offset))
+        return record
\ No newline at end of file
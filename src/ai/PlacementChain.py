@@ -0,0 +1,288 @@
+from ai.Board import Board
+from ai.ShipShape import ShipShape
+import numpy as np
+from threading import Event
+import random
+import time
+
+
+class PlacementChain:
+    """
+    Samples ship placements with a markov chain that is kept alive between shots.
+
+    It holds a population of valid placements of the ships that are left. Ships only lie on NO_INFO cells and don't touch each other.
+    Every step changes one placement by shifting, rotating or moving a ship to a random position, or by swapping the positions of two ships. All moves are symmetric, so a move is accepted whenever the new placement is valid. That way every valid placement is equally likely in the long run.
+
+    When the board changes, only the placements that became invalid are repaired. The population itself carries over to the next shot, only the counted samples are reset.
+
+    Attributes:
+        populationSize (int): How many placements are kept.
+        placements (list[list[ShipShape]]): The population.
+        samples (int): How many placements have been counted since the board changed.
+    """
+
+    POPULATION_SIZE = 32
+    MAX_FILL_TRIES = 8
+
+    # move types
+    SHIFT  = 0
+    ROTATE = 1
+    JUMP   = 2
+    SWAP   = 3
+
+    def __init__(self, populationSize : int = POPULATION_SIZE):
+        """
+        Constructor of the PlacementChain class.
+
+        Args:
+            populationSize (int, optional): How many placements are kept. Defaults to POPULATION_SIZE.
+        """
+        self.populationSize = populationSize
+        self.placements : list[list[ShipShape]] = []
+        self.samples = 0
+
+        self.__width = 0
+        self.__height = 0
+        self.__freeMask = None
+        self.__lengths : list[int] = []
+        self.__candidates : dict[int, list[ShipShape]] = {}
+        self.__occupiedMasks : list[int] = []
+        self.__shapeCounts : dict[ShipShape, int] = {}
+
+    def update(self, board : Board, numShips : dict[int, int]) -> None:
+        """
+        Adapts the population to a new board state. Placements that are still valid are kept as they are.
+
+        Args:
+            board (Board): Board state.
+            numShips (dict[int, int]): How many ships of which length are left. The key is the length of the ships and values is the number of that kind of ships.
+        """
+        freeMask = ShipShape.cellsMask([ cell for cell in board.orderedIndex() if board.check(cell, Board.NO_INFO) ])
+
+        lengths : list[int] = []
+        for length, count in sorted(numShips.items(), reverse=True):
+            lengths += [ length ] * count
+
+        if freeMask == self.__freeMask and lengths == self.__lengths:
+            return
+
+        self.__width, self.__height = board.width, board.height
+        self.__freeMask = freeMask
+        self.__lengths = lengths
+        self.__candidates = { length: self.__shapesOnFreeCells(length) for length in set(lengths) }
+        self.__shapeCounts = {}
+        self.samples = 0
+
+        repaired = [ ships for ships in map(self.__repair, self.placements) if ships is not None ]
+
+        # refill the population with copies of the repaired placements or fresh ones
+        for _ in range(self.populationSize * PlacementChain.MAX_FILL_TRIES):
+            if len(repaired) >= self.populationSize:
+                break
+
+            ships = list(random.choice(repaired)) if repaired else self.__placeShips([], lengths)
+            if ships is not None:
+                repaired.append(ships)
+
+        self.placements = repaired
+        self.__occupiedMasks = [ PlacementChain.__occupiedMask(ships) for ships in repaired ]
+
+    def run(self, deadline : float, cancelled : Event = None) -> int:
+        """
+        Moves every placement of the population one step at a time until the deadline and counts the visited placements.
+
+        Args:
+            deadline (float): Until when (time.perf_counter) the chain runs.
+            cancelled (Event, optional): If it is set, the chain stops before the deadline. Defaults to None.
+
+        Returns:
+            int: How many placements have been counted since the board changed.
+        """
+        if not self.placements or not self.__lengths:
+            return self.samples
+
+        while time.perf_counter() < deadline and not (cancelled is not None and cancelled.is_set()):
+            for i in range(len(self.placements)):
+                self.__step(i)
+
+                for ship in self.placements[i]:
+                    self.__shapeCounts[ship] = self.__shapeCounts.get(ship, 0) + 1
+
+            self.samples += len(self.placements)
+
+        return self.samples
+
+    def propabilities(self) -> np.ndarray:
+        """
+        Returns for every cell in how many of the counted placements it is occupied. Normalized to the number of samples.
+
+        Returns:
+            np.ndarray: Propabilities of shape (width, height).
+        """
+        propabilities = np.zeros((self.__width, self.__height))
+
+        for ship, count in self.__shapeCounts.items():
+            for cell in ship.occupied:
+                propabilities[cell] += count
+
+        return propabilities / max(self.samples, 1)
+
+    def __step(self, index : int) -> None:
+        """
+        Proposes a random move for a placement and accepts it if the result is valid.
+
+        Args:
+            index (int): Index of the placement in the population.
+        """
+        ships = self.placements[index]
+        occupied = self.__occupiedMasks[index]
+
+        k = random.randrange(len(ships))
+        ship = ships[k]
+        others = occupied ^ ship.occupiedMask
+        move = random.randrange(4)
+
+        if move == PlacementChain.SWAP:
+            j = random.randrange(len(ships))
+            other = ships[j]
+            if other.length == ship.length:
+                return
+
+            if not (self.__isOnBoard(ship.length, other.cell, other.orientation) and self.__isOnBoard(other.length, ship.cell, ship.orientation)):
+                return
+
+            others ^= other.occupiedMask
+            newShip  = ShipShape(ship.length, other.cell, other.orientation)
+            newOther = ShipShape(other.length, ship.cell, ship.orientation)
+
+            if not (self.__isValid(newShip, others) and self.__isValid(newOther, others | newShip.occupiedMask)):
+                return
+
+            ships[k], ships[j] = newShip, newOther
+            self.__occupiedMasks[index] = others | newShip.occupiedMask | newOther.occupiedMask
+            return
+
+        if move == PlacementChain.SHIFT:
+            step = random.choice((-1, 1))
+            cell = (ship.cell[0] + step, ship.cell[1]) if random.random() < 0.5 else (ship.cell[0], ship.cell[1] + step)
+            if not self.__isOnBoard(ship.length, cell, ship.orientation):
+                return
+            newShip = ShipShape(ship.length, cell, ship.orientation)
+        elif move == PlacementChain.ROTATE:
+            if not self.__isOnBoard(ship.length, ship.cell, 1 - ship.orientation):
+                return
+            newShip = ShipShape(ship.length, ship.cell, 1 - ship.orientation)
+        else:
+            newShip = random.choice(self.__candidates[ship.length])
+
+        if not self.__isValid(newShip, others):
+            return
+
+        ships[k] = newShip
+        self.__occupiedMasks[index] = others | newShip.occupiedMask
+
+    def __isOnBoard(self, length : int, cell : tuple[int], orientation : int) -> bool:
+        """
+        Checks if a ship would lie on the board. Ships off the board aren't constructed, as their tiles might not fit in the masks.
+
+        Args:
+            length (int): Length of the ship.
+            cell (tuple[int]): Cell coordinate of the top left most cell of the ship.
+            orientation (int): Orientation of the ship.
+
+        Returns:
+            bool: If the ship would lie on the board.
+        """
+        return ShipShape.shapeInBoardBounds(length, cell, orientation, self.__width, self.__height)
+
+    def __isValid(self, ship : ShipShape, others : int) -> bool:
+        """
+        Checks if a ship lies on free cells and doesn't touch the other ships.
+
+        Args:
+            ship (ShipShape): The ship to check.
+            others (int): Occupied mask of the other ships.
+
+        Returns:
+            bool: If the ship may be placed.
+        """
+        return ship.occupiedMask & ~self.__freeMask == 0 and ship.blockedMask & others == 0
+
+    def __repair(self, ships : list[ShipShape]) -> list[ShipShape] | None:
+        """
+        Keeps the ships of a placement that still lie on free cells and places the missing ones again.
+
+        Args:
+            ships (list[ShipShape]): A placement of the old board state.
+
+        Returns:
+            list[ShipShape]: The repaired placement. Or:
+            None: If the missing ships couldn't be placed.
+        """
+        missing = list(self.__lengths)
+        kept : list[ShipShape] = []
+
+        for ship in ships:
+            if ship.length in missing and ship.occupiedMask & ~self.__freeMask == 0:
+                missing.remove(ship.length)
+                kept.append(ship)
+
+        if not missing:
+            return kept
+
+        return self.__placeShips(kept, missing)
+
+    def __placeShips(self, ships : list[ShipShape], lengths : list[int]) -> list[ShipShape] | None:
+        """
+        Adds ships one after another at random valid positions.
+
+        Args:
+            ships (list[ShipShape]): Ships that are already placed.
+            lengths (list[int]): Lengths of the ships to add.
+
+        Returns:
+            list[ShipShape]: The completed placement. Or:
+            None: If a ship couldn't be placed.
+        """
+        ships = list(ships)
+        occupied = PlacementChain.__occupiedMask(ships)
+
+        for length in lengths:
+            options = [ ship for ship in self.__candidates[length] if ship.blockedMask & occupied == 0 ]
+            if not options:
+                return None
+
+            ship = random.choice(options)
+            ships.append(ship)
+            occupied |= ship.occupiedMask
+
+        return ships
+
+    def __shapesOnFreeCells(self, length : int) -> list[ShipShape]:
+        """
+        Lists all ships of a length that only lie on free cells.
+
+        Args:
+            length (int): Length of the ships.
+
+        Returns:
+            list[ShipShape]: The ships.
+        """
+        shapes = (ShipShape(length, (x, y), orientation) for y in range(self.__height) for x in range(self.__width) for orientation in (ShipShape.HORIZONTAL, ShipShape.VERTICAL) if self.__isOnBoard(length, (x, y), orientation))
+        return [ ship for ship in shapes if ship.occupiedMask & ~self.__freeMask == 0 ]
+
+    @staticmethod
+    def __occupiedMask(ships : list[ShipShape]) -> int:
+        """
+        Combines the occupied masks of ships.
+
+        Args:
+            ships (list[ShipShape]): The ships.
+
+        Returns:
+            int: The combined mask.
+        """
+        mask = 0
+        for ship in ships:
+            mask |= ship.occupiedMask
+        return mask
@@ -1,19 +1,29 @@
+from threading import Event
+import numpy as np
 from ai.Board import Board
-from ai.ShipShape import ShipShape
+from ai.PlacementChain import PlacementChain
 
 class ProAi:
     """
     Sets shots using a mechenism that i saw here: https://www.youtube.com/watch?v=Sef2-aHGZDU.
-    
+
     It's basically the BruteForceGameAi but it doesn't care if 2 ships of a guessed Placament overlap.
+
+    The propabilities are calculated with numpy on stacked boards. So many independent games can be evaluated at once using getNextShots.
+
+    If there is time left until a deadline, the answer is refined by sampling ship placements where the ships don't overlap. The more samples, the more precise the propabilities get.
+    The samples come from a PlacementChain that is kept between shots, so the sampling doesn't start from scratch every shot.
     """
 
+    MIN_SAMPLES = 50
+
     def __init__(self):
         """
         Constructor if the ProAi class.
         """
         self.propabilities = None
-    
+        self.chain = PlacementChain()
+
     def update(self, board : Board, numShips : dict[int, int]) -> None:
         """
         Updates stored propabilities.
@@ -22,98 +32,199 @@ class ProAi:
             board (Board): Board state.
             numShips (dict[int, int]): How many ships of which length. The key is the length of the ships and values is the number of that kind of ships.
         """
-        possibleShipLocations = self.__getAllPossibleShipLocations(board)
-        
+        boards = ProAi.boardsToArray([ board ])
+        fleets = ProAi.fleetsToArray([ numShips ])
 
-        self.propabilities = [ [0 for _ in range(board.width) ] for _ in range(board.height) ]
+        # the board already knows its free runs
+        horizontalRuns = np.array([ board.freeRuns(Board.RIGHT, Board.NO_INFO) ], dtype=np.int32)
+        verticalRuns   = np.array([ board.freeRuns(Board.DOWN, Board.NO_INFO) ], dtype=np.int32)
 
-        for (length, count) in numShips.items():
-            if count == 0:
-                continue
-                
-            props = self.__cellPropsForShip(board, possibleShipLocations, length)
+        self.propabilities = ProAi.__densities(boards, fleets, horizontalRuns, verticalRuns)[0]
 
-            for (x, y) in board.orderedIndex():
-                self.propabilities[x][y] += props[x][y] * count
-        
+    def getNextShot(self, board : Board, numShips : dict[int, int], deadline : float = None, cancelled : Event = None) -> tuple[int]:
+        """
+        Calculates the next shot.
 
-    def __cellPropsForShip(self, board : Board, possibleShipLocations : list[tuple[int]], length : int) -> list[list[float]]:
+        Args:
+            board (Board): The current board state on which it shoots.
+            numShips (dict[int, int]): How many ships of which length. The key is the length of the ships and values is the number of that kind of ships.
+            deadline (float, optional): Until when (time.perf_counter) the answer may be refined by sampling. If None, no sampling happens. Defaults to None.
+            cancelled (Event, optional): If it is set, the sampling stops before the deadline. Defaults to None.
+
+        Returns:
+            tuple[int]: Next shot position / tile.
         """
-        Calculates for each cell the likelyhood that a ship of a given length is there.
+        self.update(board, numShips)
+
+        if deadline is not None:
+            self.refine(board, numShips, deadline, cancelled)
+
+        x, y = ProAi.__pickBestCells(self.propabilities[np.newaxis])[0]
+        return (int(x), int(y))
+
+    def refine(self, board : Board, numShips : dict[int, int], deadline : float, cancelled : Event = None) -> int:
+        """
+        Samples non overlapping ship placements until the deadline and replaces the stored propabilities by the sampled ones.
+
+        The stored propabilities are only replaced if at least MIN_SAMPLES placements have been sampled for the current board state. The old propabilities are kept as tie breaker.
 
         Args:
             board (Board): Board state.
-            possibleShipLocations (list[tuple[int]]): All cells a ships can be.
-            length (int): Length of the ship to be looking for.
+            numShips (dict[int, int]): How many ships of which length. The key is the length of the ships and values is the number of that kind of ships.
+            deadline (float): Until when (time.perf_counter) placements are sampled.
+            cancelled (Event, optional): If it is set, the sampling stops before the deadline. Defaults to None.
+
+        Returns:
+            int: The number of sampled placements.
+        """
+        self.chain.update(board, numShips)
+        samples = self.chain.run(deadline, cancelled)
+
+        if samples >= ProAi.MIN_SAMPLES:
+            tieBreaker = self.propabilities / max(self.propabilities.max(), 1.)
+            self.propabilities = self.chain.propabilities() + tieBreaker / (samples + 1)
+
+        return samples
+
+    @staticmethod
+    def getNextShots(boards : np.ndarray, fleets : np.ndarray) -> np.ndarray:
+        """
+        Calculates the next shot for many independent games in one vectorized pass.
+
+        Args:
+            boards (np.ndarray): Stacked board states of shape (games, width, height). boards[i, x, y] is the state of the cell (x, y) in game i. See boardsToArray.
+            fleets (np.ndarray): Ships that are left of shape (games, maxLength + 1). fleets[i, length] is the number of ships of that length left in game i. See fleetsToArray.
 
         Raises:
-            ValueError: If no possible ship position was found. That should not happen.
+            ValueError: If a ship that is left can't be placed on its board. That should not happen.
 
         Returns:
-            list[list[float]]: For all cells the propability that a ship of a given length is there.
-        """
-        orientations = [ ShipShape.VERTICAL, ShipShape.HORIZONTAL ]
-        props = [ [0 for _ in range(board.width) ] for _ in range(board.height) ]
-        placementCount = 0
-
-        for (x, y) in possibleShipLocations:
-            for orientation in orientations:
-                tempShip = ShipShape(length, (x, y), orientation)
-
-                # is the ship on the board
-                if not tempShip.isInBoardBounds(board.width, board.height):
-                    continue
-
-                # check if it matches the boards requirements
-                if not all(board.check(tile, Board.NO_INFO) for tile in tempShip.occupiedTiles()):
-                    continue
-                    
-                # register ship
-                placementCount += 1
-                for (shipX, shipY) in tempShip.occupiedTiles():
-                    props[shipX][shipY] += 1
-        
-        if placementCount == 0:
-            raise ValueError(f"Ship of length {length} coudnt be placed on the board")
-
-        
-        # normalize everything to 1
-        for (x, y) in board.orderedIndex():
-            props[x][y] = (props[x][y] / placementCount)**2
-        
-        return props
-
-    def __getAllPossibleShipLocations(self, board : Board) -> list[tuple[int]]:
-        """
-        Calculates all cells a ships can be.
+            np.ndarray: Next shot position / tile of every game. It has the shape (games, 2).
+        """
+        return ProAi.__pickBestCells(ProAi.__densities(boards, fleets))
+
+    @staticmethod
+    def boardsToArray(boards : list[Board]) -> np.ndarray:
+        """
+        Stacks board states so they can be passed to getNextShots.
 
         Args:
-            board (Board): Board state.
+            boards (list[Board]): Board states. All of them need the same width and height.
 
         Returns:
-            list[tuple[int]]: All cells a ships can be.
+            np.ndarray: Stacked board states of shape (games, width, height). boards[i, x, y] is the state of the cell (x, y) in game i.
         """
-        return [ (x, y) for x, y in board.orderedIndex() if board.check((x, y), Board.NO_INFO) and (board.check((x+1, y), Board.NO_INFO) or board.check((x, y+1), Board.NO_INFO)) ]
-    
-    def getNextShot(self, board : Board, numShips : dict[int, int]) -> tuple[int]:
+        return np.array([ board.data for board in boards ], dtype=np.int32)
+
+    @staticmethod
+    def fleetsToArray(numShips : list[dict[int, int]]) -> np.ndarray:
         """
-        Calculates the next shot. 
+        Stacks ship counts so they can be passed to getNextShots.
 
         Args:
-            board (Board): The current board state on which it shoots.
-            numShips (dict[int, int]): How many ships of which length. The key is the length of the ships and values is the number of that kind of ships.
+            numShips (list[dict[int, int]]): How many ships of which length for every game. The key is the length of the ships and values is the number of that kind of ships.
 
         Returns:
-            tuple[int]: Next shot position / tile.
+            np.ndarray: Stacked ship counts of shape (games, maxLength + 1).
         """
-        self.update(board, numShips)
+        maxLength = max((length for ships in numShips for length in ships.keys()), default=0)
+        fleets = np.zeros((len(numShips), maxLength + 1), dtype=np.int32)
+
+        for i, ships in enumerate(numShips):
+            for length, count in ships.items():
+                fleets[i, length] = count
+
+        return fleets
+
+    @staticmethod
+    def __densities(boards : np.ndarray, fleets : np.ndarray, horizontalRuns : np.ndarray = None, verticalRuns : np.ndarray = None) -> np.ndarray:
+        """
+        Calculates for each cell of each board how likely it is that a ship is there.
+
+        For every ship length the placements that only lie on NO_INFO cells are counted per cell. The share of placements is squared and weighted by the number of ships of that length.
+
+        Args:
+            boards (np.ndarray): Stacked board states of shape (games, width, height).
+            fleets (np.ndarray): Ships that are left of shape (games, maxLength + 1).
+            horizontalRuns (np.ndarray, optional): Free runs of NO_INFO cells along x of shape (games, width, height). Calculated if None. Defaults to None.
+            verticalRuns (np.ndarray, optional): Free runs of NO_INFO cells along y of shape (games, width, height). Calculated if None. Defaults to None.
+
+        Raises:
+            ValueError: If a ship that is left can't be placed on its board. That should not happen.
+
+        Returns:
+            np.ndarray: Propabilities of shape (games, width, height).
+        """
+        if horizontalRuns is None or verticalRuns is None:
+            free = boards == Board.NO_INFO
+            horizontalRuns = ProAi.__runLengths(free, 1)
+            verticalRuns   = ProAi.__runLengths(free, 2)
+
+        _, width, height = boards.shape
+        propabilities = np.zeros(boards.shape)
+
+        for length in range(1, fleets.shape[1]):
+            counts = fleets[:, length]
+            if not counts.any():
+                continue
+
+            # a ship fits on a start cell if the free run starting there is long enough
+            horizontalStarts = horizontalRuns >= length
+            verticalStarts   = verticalRuns >= length
+
+            coverage = np.zeros(boards.shape, dtype=np.int32)
+            for i in range(length):
+                coverage[:, i:, :] += horizontalStarts[:, :width - i, :]
+                coverage[:, :, i:] += verticalStarts[:, :, :height - i]
+
+            placementCount = horizontalStarts.sum(axis=(1, 2)) + verticalStarts.sum(axis=(1, 2))
+
+            if np.any((counts > 0) & (placementCount == 0)):
+                game = int(np.argmax((counts > 0) & (placementCount == 0)))
+                raise ValueError(f"Ship of length {length} coudnt be placed on the board of game {game}")
+
+            # normalize everything to 1
+            shares = coverage / np.maximum(placementCount, 1)[:, np.newaxis, np.newaxis]
+            propabilities += shares**2 * counts[:, np.newaxis, np.newaxis]
+
+        return propabilities
+
+    @staticmethod
+    def __runLengths(free : np.ndarray, axis : int) -> np.ndarray:
+        """
+        Counts for every cell how many free cells follow in the direction of the axis. The cell itself is included.
+
+        Args:
+            free (np.ndarray): Boolean array of shape (games, width, height) that marks the free cells.
+            axis (int): 1 to count along x, 2 to count along y.
+
+        Returns:
+            np.ndarray: Run lengths of shape (games, width, height).
+        """
+        free = np.moveaxis(free, axis, 0)
+        runs = np.zeros(free.shape, dtype=np.int32)
+
+        runs[-1] = free[-1]
+        for i in range(free.shape[0] - 2, -1, -1):
+            runs[i] = (runs[i + 1] + 1) * free[i]
+
+        return np.moveaxis(runs, 0, axis)
+
+    @staticmethod
+    def __pickBestCells(propabilities : np.ndarray) -> np.ndarray:
+        """
+        Selects the most likely cell of every board. Ties are broken randomly.
+
+        Args:
+            propabilities (np.ndarray): Propabilities of shape (games, width, height).
+
+        Returns:
+            np.ndarray: The selected cells of shape (games, 2).
+        """
+        games, width, height = propabilities.shape
+        flat = propabilities.reshape(games, width * height)
 
-        bestProp = -1
-        bestCell = (-1, -1)
+        isBest = flat == flat.max(axis=1, keepdims=True)
+        best = np.argmax(np.random.random(flat.shape) * isBest, axis=1)
 
-        for (x, y) in board.shuffledIndex():
-            if self.propabilities[x][y] > bestProp:
-                bestProp = self.propabilities[x][y]
-                bestCell = (x, y)
-        
-        return bestCell
\ No newline at end of file
+        return np.stack(np.unravel_index(best, (width, height)), axis=1)
\ No newline at end of file
@@ -1,21 +1,46 @@
-from ai.Board import Board
+import random
 
 
 class RandomGameAi:
     """
     Shoots randomly on th board. Only pays attention where you already shot at.
+
+    The cells that haven't been shot at are kept in a pool. A shot is drawn uniformly from the pool and shot cells are removed by swapping them with the last one. So both is O(1).
     """
 
-    def getNextShot(self, board : Board) -> tuple[int]:
+    def __init__(self, boardWidth : int, boardHeight : int):
         """
-        Calculates the next shot. 
+        Constructor of the RandomGameAi class.
 
         Args:
-            board (Board): The current board state on which it shoots.
+            boardWidth (int): Amount of columns of the board.
+            boardHeight (int): Amount of rows of the board.
+        """
+        self.freeCells = [ (x, y) for y in range(boardHeight) for x in range(boardWidth) ]
+        self.freeCellIndices = { cell: i for i, cell in enumerate(self.freeCells) }
+
+    def getNextShot(self) -> tuple[int]:
+        """
+        Calculates the next shot. 
 
         Returns:
             tuple[int]: Next shot position / tile.
         """
-        for cell in board.shuffledIndex():
-            if not(board.check(cell, Board.SHIP | Board.CHECKED_NO_SHIP)):
-                return cell
\ No newline at end of file
+        return self.freeCells[random.randrange(len(self.freeCells))]
+
+    def submitInfo(self, pos : tuple[int]) -> None:
+        """
+        Removes a cell that was shot at from the pool.
+
+        Args:
+            pos (tuple[int]): The x and y coordinate of the cell in question.
+        """
+        pos = (int(pos[0]), int(pos[1])) # in case it is a np.ndarray
+        index = self.freeCellIndices.pop(pos, None)
+        if index is None:
+            return
+
+        last = self.freeCells.pop()
+        if index < len(self.freeCells):
+            self.freeCells[index] = last
+            self.freeCellIndices[last] = index
@@ -0,0 +1,134 @@
+from typing import Generator
+import mmap
+import os
+import struct
+from ai.GameRecord import GameRecord
+
+
+class ReplayStore:
+    """
+    Append only store of GameRecords on disk.
+
+    The records are written into segment files of at most SEGMENT_SIZE bytes. Every record is prefixed by its length (u32, little endian).
+    For reading, the segments are memory mapped. So millions of games can be streamed without loading them into memory.
+
+    Only one process should append to a store at a time.
+
+    Attributes:
+        folder (str): The folder that holds the segment files.
+    """
+
+    DEFAULT_FOLDER = os.path.join(os.path.dirname(__file__), "../../records/")
+    SEGMENT_SIZE = 64 << 20
+    SEGMENT_NAME = "segment_{:06d}.bin"
+    LENGTH = struct.Struct("<I")
+
+    def __init__(self, folder : str = DEFAULT_FOLDER):
+        """
+        Constructor of the ReplayStore class.
+
+        The folder is created if it doesn't exist yet.
+
+        Args:
+            folder (str, optional): The folder that holds the segment files. Defaults to DEFAULT_FOLDER.
+        """
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+        self.__segmentIndex = max(len(self.segmentPaths()) - 1, 0)
+        self.__file = None
+        self.__truncateIncompleteRecord()
+
+    def segmentPaths(self) -> list[str]:
+        """
+        Returns the paths of all segment files in order.
+
+        Returns:
+            list[str]: The paths of all segment files.
+        """
+        paths = []
+        while os.path.exists(os.path.join(self.folder, ReplayStore.SEGMENT_NAME.format(len(paths)))):
+            paths.append(os.path.join(self.folder, ReplayStore.SEGMENT_NAME.format(len(paths))))
+        return paths
+
+    def append(self, record : GameRecord) -> None:
+        """
+        Appends a record to the last segment. A new segment is started if the last one is full.
+
+        Args:
+            record (GameRecord): The record to be stored.
+        """
+        data = record.toBytes()
+
+        if self.__file is None:
+            self.__file = open(os.path.join(self.folder, ReplayStore.SEGMENT_NAME.format(self.__segmentIndex)), "ab")
+
+        if self.__file.tell() > 0 and self.__file.tell() + ReplayStore.LENGTH.size + len(data) > ReplayStore.SEGMENT_SIZE:
+            self.__file.close()
+            self.__segmentIndex += 1
+            self.__file = open(os.path.join(self.folder, ReplayStore.SEGMENT_NAME.format(self.__segmentIndex)), "ab")
+
+        self.__file.write(ReplayStore.LENGTH.pack(len(data)))
+        self.__file.write(data)
+        self.__file.flush()
+
+    def records(self) -> Generator[GameRecord, None, None]:
+        """
+        Streams all stored records in the order they were appended.
+
+        An incomplete record at the end of a segment (eg after a crash) is skipped. It will be cut off when the store is opened for appending the next time.
+
+        Yields:
+            Generator[GameRecord, None, None]: All stored records.
+        """
+        for path in self.segmentPaths():
+            if os.path.getsize(path) == 0:
+                continue
+
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for offset, length in ReplayStore.__recordSpans(buffer):
+                    yield GameRecord.fromBytes(buffer[offset:offset + length])
+
+    @staticmethod
+    def __recordSpans(buffer : mmap.mmap) -> Generator[tuple[int, int], None, None]:
+        """
+        Yields the position of every complete record in a segment.
+
+        Args:
+            buffer (mmap.mmap): The mapped segment.
+
+        Yields:
+            Generator[tuple[int, int], None, None]: Offset and length of every record.
+        """
+        offset = 0
+        while offset + ReplayStore.LENGTH.size <= len(buffer):
+            (length,) = ReplayStore.LENGTH.unpack_from(buffer, offset)
+            offset += ReplayStore.LENGTH.size
+            if offset + length > len(buffer):
+                return
+
+            yield offset, length
+            offset += length
+
+    def __truncateIncompleteRecord(self) -> None:
+        """
+        Cuts off an incomplete record at the end of the last segment, so that new records can be appended behind the complete ones.
+        """
+        path = os.path.join(self.folder, ReplayStore.SEGMENT_NAME.format(self.__segmentIndex))
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+
+        with open(path, "r+b") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                end = 0
+                for offset, length in ReplayStore.__recordSpans(buffer):
+                    end = offset + length
+            file.truncate(end)
+
+    def close(self) -> None:
+        """
+        Closes the currently opened segment file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
\ No newline at end of file
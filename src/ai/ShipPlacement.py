@@ -10,8 +10,14 @@ class ShipPlacement:
 
     A placement is valid if no pair of ships in the placement interfere. Meaning that they don't cross and are not in the surrounding tiles. See ShipShape.interfere
 
+    The occupied and blocked tiles of all ships are cached as bit masks (see ShipShape.cellBit). Ships should only be added with add, so the masks stay up to date.
+
+    Placements are compared by value. Two placements are equal if they contain the same ships, no matter in which order they were added. The occupied mask is used as hash. So a placement shouldn't be changed while it is in a set.
+
     Attributes:
         ships (set[ShipShape]): collection of ships in the placement
+        occupiedMask (int): Bit mask of all occupied tiles.
+        blockedMask (int): Bit mask of all blocked tiles.
     """
 
     def __init__(self, ships : list[ShipShape] = []):
@@ -22,7 +28,20 @@ class ShipPlacement:
             ships (list[ShipShape], optional): Predefined collection of ships that should be included. Defaults to [].
         """
         self.ships = set(ships)
+        self.occupiedMask = 0
+        self.blockedMask = 0
+        for ship in self.ships:
+            self.occupiedMask |= ship.occupiedMask
+            self.blockedMask |= ship.blockedMask
 
+
+    def __eq__(self, other : object) -> bool:
+        if not isinstance(other, ShipPlacement):
+            return NotImplemented
+        return self.occupiedMask == other.occupiedMask and self.ships == other.ships
+
+    def __hash__(self) -> int:
+        return hash(self.occupiedMask)
     
     def fitsIn(self, ship : ShipShape) -> bool:
         """
@@ -34,7 +53,7 @@ class ShipPlacement:
         Returns:
             bool: If the ship meets the creteria to be added to the placement. Meaning that if it would be added, whether the new ShipPlacement would be valid.
         """
-        return all(not ship.interferesWith(other) for other in self.ships)
+        return not ship.blockedMask & self.occupiedMask
     
     def add(self, ship : ShipShape) -> None:
         """
@@ -46,6 +65,8 @@ class ShipPlacement:
             ship (ShipShape): The new ShipShape to be added
         """
         self.ships.add(ship)
+        self.occupiedMask |= ship.occupiedMask
+        self.blockedMask |= ship.blockedMask
     
     def cellOccupied(self, cell : tuple[int]) -> bool:
         """
@@ -57,8 +78,7 @@ class ShipPlacement:
         Returns:
             bool: If the specified cell is occupied by any ship in the placement. (See ShipShape.occupiedTiles)
         """
-        cell = (cell[0], cell[1]) # in case it is a np.ndarray
-        return any(ship.getOccupiedRect().includesPoint(cell) for ship in self.ships)
+        return bool(self.occupiedMask & ShipShape.cellBit(cell))
 
     def occupiedCells(self) -> Generator[tuple[int], None, None]:
         """
@@ -89,6 +109,8 @@ class ShipPlacement:
         """
         cpy = ShipPlacement()
         cpy.ships = self.ships.copy()
+        cpy.occupiedMask = self.occupiedMask
+        cpy.blockedMask = self.blockedMask
         return cpy
 
     # generate random playcement
@@ -136,8 +158,11 @@ class ShipPlacement:
         for pos in board.shuffledIndex():
             orientations = random.sample([ ShipShape.VERTICAL, ShipShape.HORIZONTAL ], 2)
             for orientation in orientations:
+                if not ShipShape.shapeInBoardBounds(crntLength, pos, orientation, board.width, board.height):
+                    continue
+
                 tempShip = ShipShape(crntLength, pos, orientation)
-                if tempShip.isInBoardBounds(board.width, board.height) and crntPlacement.fitsIn(tempShip):
+                if crntPlacement.fitsIn(tempShip):
                     tempPlacement = crntPlacement.copy()
                     tempPlacement.add(tempShip)
                     finalPlacement = self.__generateInner(shipsToDo, tempPlacement, board)
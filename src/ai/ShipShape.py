@@ -1,16 +1,20 @@
-from typing import Generator
+from threading import Lock
 
 
 class ShipRect:
     """
     Represents a rect on the board. Usally used for ships.
 
+    Rects are immutable.
+
     Attributes:
         left (int): x coordinate of the left side of the rect.
         right (int): x coordinate of the right side of the rect.
         top (int): y coordinate of the top side of the rect.
         bottom (int): y coordinate of the bottom side of the rect.
     """
+
+    __slots__ = ("left", "right", "top", "bottom")
     
     def __init__(self, left : int, right : int, top : int, bottom : int):
         """
@@ -22,10 +26,16 @@ class ShipRect:
             top (int): y coordinate of the top side of the rect.
             bottom (int): y coordinate of the bottom side of the rect.
         """
-        self.left = left
-        self.right = right
-        self.top = top
-        self.bottom = bottom
+        object.__setattr__(self, "left", left)
+        object.__setattr__(self, "right", right)
+        object.__setattr__(self, "top", top)
+        object.__setattr__(self, "bottom", bottom)
+
+    def __setattr__(self, name : str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (ShipRect, (self.left, self.right, self.top, self.bottom))
 
     def collidesWith(self, other : 'ShipRect') -> bool:
         """
@@ -55,27 +65,140 @@ class ShipShape:
     """
     Represents a possible Ship position.
 
+    Shapes are immutable and interned. Constructing a shape with the same length, cell and orientation returns the same object.
+    Only shapes whose tiles can be represented in the masks can be constructed, so the number of interned shapes is bounded.
+    The occupied and blocked tiles are computed once on creation, as tuples and as bit masks. See ShipShape.cellBit for the mask layout.
+
     Attributes:
         length (int): Length of the ship.
         cell (tuple[int]): Cell coordinate of the top left most cell the ship lives in.
-        orientation (int): Specefies how the ship is laying on the board. Either HORIZONTAL or VERTICAL
+        orientation (int): Specefies how the ship is laying on the board. Either HORIZONTAL or VERTICAL. Any other value means the ship isn't on the board and has no tiles.
+        occupied (tuple[tuple[int]]): All tiles that lie in the ship.
+        blocked (tuple[tuple[int]]): All tiles that lie in the ship and all surrounding tiles. Including the diagonal ones.
+        occupiedMask (int): Bit mask of the occupied tiles.
+        blockedMask (int): Bit mask of the blocked tiles.
     """
 
     HORIZONTAL = 0
     VERTICAL = 1
 
-    def __init__(self, length : int, cell : tuple[int], orientation : int):
+    # cells from -1 to MASK_STRIDE - 2 can be represented in the masks. So boards may be at most MASK_STRIDE - 2 wide and high
+    MASK_STRIDE = 32
+
+    __slots__ = ("length", "cell", "orientation", "occupied", "blocked", "occupiedMask", "blockedMask", "occupiedRect", "blockedRect")
+
+    __shapes : dict[tuple, 'ShipShape'] = {}
+    __shapesLock = Lock()
+
+    def __new__(cls, length : int, cell : tuple[int], orientation : int) -> 'ShipShape':
         """
-        Construcor of the ShipShape class.
+        Construcor of the ShipShape class. Returns the existing shape if there already is one with the same length, cell and orientation.
 
         Args:
             length (int): Length of the ship.
             cell (tuple[int]): Cell coordinate of the top left most cell the ship lives in.
             orientation (int): Specefies how the ship is laying on the board. Either HORIZONTAL or VERTICAL
+
+        Raises:
+            ValueError: If a tile of the ship can't be represented in the masks. See cellBit.
+        """
+        key = (int(length), (int(cell[0]), int(cell[1])), int(orientation)) # in case it is a np.ndarray
+        shape = ShipShape.__shapes.get(key)
+        if shape is not None:
+            return shape
+
+        # shapes are created by the ai threads too
+        with ShipShape.__shapesLock:
+            shape = ShipShape.__shapes.get(key)
+            if shape is None:
+                shape = super().__new__(cls)
+                shape.__setup(*key)
+                ShipShape.__shapes[key] = shape
+        return shape
+
+    def __setup(self, length : int, cell : tuple[int], orientation : int) -> None:
+        """
+        Sets all attributes of a newly created shape.
+
+        Args:
+            length (int): Length of the ship.
+            cell (tuple[int]): Cell coordinate of the top left most cell the ship lives in.
+            orientation (int): Specefies how the ship is laying on the board.
+        """
+        x, y = cell
+        if orientation == ShipShape.HORIZONTAL:
+            occupied = tuple((x + i, y) for i in range(length))
+            blocked = tuple((x + i, y + j) for i in range(-1, length + 1) for j in (0, -1, 1))
+            occupiedRect = ShipRect(x, x + length - 1, y, y)
+            blockedRect = ShipRect(x - 1, x + length, y - 1, y + 1)
+        elif orientation == ShipShape.VERTICAL:
+            occupied = tuple((x, y + i) for i in range(length))
+            blocked = tuple((x + j, y + i) for i in range(-1, length + 1) for j in (0, -1, 1))
+            occupiedRect = ShipRect(x, x, y, y + length - 1)
+            blockedRect = ShipRect(x - 1, x + 1, y - 1, y + length)
+        else:
+            occupied = ()
+            blocked = ()
+            occupiedRect = ShipRect(x, x, y, y + length - 1)
+            blockedRect = ShipRect(x - 1, x + 1, y - 1, y + length)
+
+        values = {
+            "length": length,
+            "cell": cell,
+            "orientation": orientation,
+            "occupied": occupied,
+            "blocked": blocked,
+            "occupiedMask": ShipShape.cellsMask(occupied),
+            "blockedMask": ShipShape.cellsMask(blocked),
+            "occupiedRect": occupiedRect,
+            "blockedRect": blockedRect
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name : str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (ShipShape, (self.length, self.cell, self.orientation))
+
+    def __repr__(self) -> str:
+        return f"ShipShape({self.length}, {self.cell}, {self.orientation})"
+
+    @staticmethod
+    def cellBit(cell : tuple[int]) -> int:
+        """
+        Returns the bit of a cell in the masks of the shapes. The cell (x, y) has the bit (y + 1) * MASK_STRIDE + x + 1.
+
+        Args:
+            cell (tuple[int]): The cell.
+
+        Raises:
+            ValueError: If the cell can't be represented. Both coordinates have to be between -1 and MASK_STRIDE - 2.
+
+        Returns:
+            int: The bit of the cell.
+        """
+        x, y = int(cell[0]), int(cell[1])
+        if not (-1 <= x < ShipShape.MASK_STRIDE - 1 and -1 <= y < ShipShape.MASK_STRIDE - 1):
+            raise ValueError(f"The cell {(x, y)} can't be represented in the masks")
+        return 1 << ((y + 1) * ShipShape.MASK_STRIDE + x + 1)
+
+    @staticmethod
+    def cellsMask(cells : tuple[tuple[int]]) -> int:
+        """
+        Combines the bits of many cells. See ShipShape.cellBit.
+
+        Args:
+            cells (tuple[tuple[int]]): The cells.
+
+        Returns:
+            int: Mask with the bits of all cells.
         """
-        self.length = length
-        self.cell = cell
-        self.orientation = orientation
+        mask = 0
+        for cell in cells:
+            mask |= ShipShape.cellBit(cell)
+        return mask
     
     def getOccupiedRect(self) -> ShipRect:
         """
@@ -84,10 +207,7 @@ class ShipShape:
         Returns:
             ShipRect: ShipRect that covers all tiles that lie in the ship.
         """
-        if self.orientation == ShipShape.HORIZONTAL:
-            return ShipRect(self.cell[0], self.cell[0] + self.length - 1, self.cell[1], self.cell[1])
-        else:
-            return ShipRect(self.cell[0], self.cell[0], self.cell[1], self.cell[1] + self.length - 1)
+        return self.occupiedRect
     
     def getBlockedRect(self) -> ShipRect:
         """
@@ -96,45 +216,25 @@ class ShipShape:
         Returns:
             ShipRect: ShipRect that covers all tiles that lie in the ship and all surrounding tiles. Including the diagonal ones.
         """
-        if self.orientation == ShipShape.HORIZONTAL:
-            return ShipRect(self.cell[0] - 1, self.cell[0] + self.length, self.cell[1] - 1, self.cell[1] + 1)
-        else:
-            return ShipRect(self.cell[0] - 1, self.cell[0] + 1, self.cell[1] - 1, self.cell[1] + self.length)
+        return self.blockedRect
 
-
-    def occupiedTiles(self) -> Generator[tuple[int], None, None]:
+    def occupiedTiles(self) -> tuple[tuple[int]]:
         """
-        Enables to loop through all tiles that lie in the ship.
+        Returns all tiles that lie in the ship.
 
-        Yields:
-            Generator[tuple[int], None, None]: All tiles that lie in the ship.
+        Returns:
+            tuple[tuple[int]]: All tiles that lie in the ship.
         """
-        if self.orientation == ShipShape.HORIZONTAL:
-            for i in range(self.length):
-                yield (self.cell[0] + i, self.cell[1])
-        elif self.orientation == ShipShape.VERTICAL:
-            for i in range(self.length):
-                yield (self.cell[0], self.cell[1] + i)
+        return self.occupied
     
-    def blockedTiles(self) -> Generator[tuple[int], None, None]:
-        """
-        Enables to loop through all tiles that lie in the ship and all surrounding tiles. Including the diagonal ones.
-
-        Yields:
-            Generator[tuple[int], None, None]: All tiles that lie in the ship and all surrounding tiles. Including the diagonal ones.
-        """
-        tiles = []
-        if self.orientation == ShipShape.HORIZONTAL:
-            for i in range(-1, self.length + 1):
-                yield (self.cell[0] + i, self.cell[1])
-                yield (self.cell[0] + i, self.cell[1] - 1)
-                yield (self.cell[0] + i, self.cell[1] + 1)
-        elif self.orientation == ShipShape.VERTICAL:
-            for i in range(-1, self.length + 1):
-                yield (self.cell[0], self.cell[1] + i)
-                yield (self.cell[0] - 1, self.cell[1] + i)
-                yield (self.cell[0] + 1, self.cell[1] + i)
-        return tiles
+    def blockedTiles(self) -> tuple[tuple[int]]:
+        """
+        Returns all tiles that lie in the ship and all surrounding tiles. Including the diagonal ones.
+
+        Returns:
+            tuple[tuple[int]]: All tiles that lie in the ship and all surrounding tiles. Including the diagonal ones.
+        """
+        return self.blocked
     
     def interferesWith(self, other : 'ShipShape') -> bool:
         """
@@ -146,7 +246,7 @@ class ShipShape:
         Returns:
             bool: If a ShipShape lies in such a way that, it does cross the other ShipShape and is not in the surrounding tiles.
         """
-        return self.getBlockedRect().collidesWith(other.getOccupiedRect())
+        return bool(self.blockedMask & other.occupiedMask)
     
     def isInBoardBounds(self, boardWidth : int, boardHeight : int) -> bool:
         """
@@ -159,13 +259,30 @@ class ShipShape:
         Returns:
             bool: If the whole ship is in the bounds of a board.
         """
-        if self.cell[0] < 0 or self.cell[1] < 0:
+        return ShipShape.shapeInBoardBounds(self.length, self.cell, self.orientation, boardWidth, boardHeight)
+
+    @staticmethod
+    def shapeInBoardBounds(length : int, cell : tuple[int], orientation : int, boardWidth : int, boardHeight : int) -> bool:
+        """
+        Checks whether a ship would be in the bounds of a board without constructing it.
+
+        Args:
+            length (int): Length of the ship.
+            cell (tuple[int]): Cell coordinate of the top left most cell the ship lives in.
+            orientation (int): Specefies how the ship is laying on the board.
+            boardWidth (int): Amount of columns of the board.
+            boardHeight (int): Amount of rows of the board.
+
+        Returns:
+            bool: If the whole ship would be in the bounds of a board.
+        """
+        if cell[0] < 0 or cell[1] < 0:
             return False
 
-        if self.orientation == ShipShape.HORIZONTAL:
-            boardWidth -= self.length
-        elif self.orientation == ShipShape.VERTICAL:
-            boardHeight -= self.length
+        if orientation == ShipShape.HORIZONTAL:
+            boardWidth -= length
+        elif orientation == ShipShape.VERTICAL:
+            boardHeight -= length
         
-        return self.cell[0] <= boardWidth and self.cell[1] <= boardHeight
+        return cell[0] <= boardWidth and cell[1] <= boardHeight
 
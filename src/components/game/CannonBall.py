@@ -55,6 +55,8 @@ class CannonBall(Sprite):
         )
         self.explosion.animation.setRepeatMode(Animator.STOP)
 
+        Sounds.preload("cannon")
+
     
     def fire(self, start : tuple[float], dest : tuple[float], hits : bool) -> None:
         """
@@ -70,6 +72,10 @@ class CannonBall(Sprite):
         self.isHittingShot = hits
         Sounds.playSoundEffect("cannon")
 
+        # the impact sound is known already, so it can be decoded during the flight. The cannon is kept decoded for the next shot
+        Sounds.preload("explosion" if hits else "splash")
+        Sounds.preload("cannon")
+
         if hits:
             self.explosion.transform.setRelPosition(dest)
             self.explosion.animation.setEndCallback(lambda : self.animFinishedCallback(dest, hits))
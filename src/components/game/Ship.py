@@ -58,16 +58,16 @@ class Ship(ImageButton):
         """
         Should be called when the Ship gets selected.
         """
-        self._sprite.image.set_alpha(100)
+        self._sprite.setAlpha(100)
     
     def deselect(self) -> None:
         """
         Should be called when the another Ship gets selected or the selection process is canceled.
         """
-        self._sprite.image.set_alpha(255)
+        self._sprite.setAlpha(255)
     
     def onEnable(self) -> None:
-        self._sprite.image.set_alpha(255)
+        self._sprite.setAlpha(255)
 
     def getLength(self) -> int:
         """
@@ -191,14 +191,14 @@ class Ship(ImageButton):
         self.animators[0].play()
         self.animators[1].setHook(self.transform.setRelAngle)
         self.animators[1].play()
-        self.animators[2].setHook(self._sprite.image.set_alpha)
+        self.animators[2].setHook(self._sprite.setAlpha)
         self.animators[2].play()
 
         # set end hook
         def arriveCallback() -> None:
             self._sprite.enableRoation = False
             self._sprite.bakeTransform()
-            self._sprite.image.set_alpha(self.animators[2].get())
+            self._sprite.setAlpha(self.animators[2].get())
 
             Ship.arrivedShips += 1
             if Ship.travelSquenceDone():
@@ -248,7 +248,7 @@ class Ship(ImageButton):
         self.animators[0].play()
         self.animators[1].setHook(self.transform.setRelAngle)
         self.animators[1].play()
-        self.animators[2].setHook(self._sprite.image.set_alpha)
+        self.animators[2].setHook(self._sprite.setAlpha)
         self.animators[2].play()
 
 
@@ -0,0 +1,72 @@
+from typing import Callable
+import pygame
+from components.Component import Component
+from utils.Transform import Transform
+
+
+class ProgressBar(Component):
+    """
+    Represents a simple bar that fills up from left to right.
+
+    Like all components it only draws with blit. The surface of the bar is only created again when the filled width changes.
+    """
+
+    BORDER = 1
+
+    def __init__(self, size : tuple[int], getProgress : Callable[[], float], color : tuple[int] = (255, 255, 255), transform : Transform = None):
+        """
+        Constructor of the ProgressBar class.
+
+        Args:
+            size (tuple[int]): Width and height of the bar in pixels.
+            getProgress (Callable[[], float]): Returns the progress between 0 and 1. It is called once a frame in update.
+            color (tuple[int], optional): Color of the border and the filled part. Defaults to (255, 255, 255).
+            transform (Transform, optional): The Transform of the component. The bar is centered at its position. Defaults to None.
+        """
+        super().__init__(transform)
+        self.size = size
+        self.getProgress = getProgress
+        self.color = color
+
+        self.__progress = 0.
+        self.__alpha = 255
+        self.__filledWidth = -1
+        self.__pixels : pygame.Surface = None
+        self.__surface : pygame.Surface = None
+
+    def setAlpha(self, alpha : float) -> None:
+        """
+        Sets the alpha value of the whole bar.
+
+        The last frame may still refer to the current surface with its old alpha value. So the bar gets a new view of the same pixels with its own alpha value, like Sprite.setAlpha.
+
+        Args:
+            alpha (float): The alpha value between 0 and 255.
+        """
+        alpha = int(alpha)
+        if alpha == self.__alpha:
+            return
+
+        self.__alpha = alpha
+        if self.__surface is not None:
+            self.__surface = self.__pixels.subsurface(self.__pixels.get_rect())
+            self.__surface.set_alpha(self.__alpha)
+
+    def update(self, dt : float) -> None:
+        self.__progress = max(0., min(self.getProgress(), 1.))
+
+    def draw(self, screen : pygame.Surface) -> None:
+        if self.__alpha == 0:
+            return
+
+        filledWidth = round(self.__progress * (self.size[0] - 2 * ProgressBar.BORDER))
+
+        if filledWidth != self.__filledWidth:
+            self.__pixels = pygame.Surface(self.size, pygame.SRCALPHA)
+            pygame.draw.rect(self.__pixels, self.color, self.__pixels.get_rect(), ProgressBar.BORDER)
+            pygame.draw.rect(self.__pixels, self.color, (ProgressBar.BORDER, ProgressBar.BORDER, filledWidth, self.size[1] - 2 * ProgressBar.BORDER))
+            self.__surface = self.__pixels.subsurface(self.__pixels.get_rect())
+            self.__surface.set_alpha(self.__alpha)
+            self.__filledWidth = filledWidth
+
+        screen.blit(self.__surface, self.__surface.get_rect(center=self.transform.getPosition()))
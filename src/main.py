@@ -10,6 +10,7 @@ from scenes.Scene import SceneManager
 from utils.Animator import Animator
 from utils.Input import Input
 from utils.Timer import Timer
+from utils.AssetLoader import AssetLoader
 from utils.Images import Images
 from utils.Sounds import Sounds
 
@@ -29,9 +30,9 @@ def main():
 
     shouldRun = True
 
-    # Load recources
-    Images.loadAll()
-    Sounds.loadAll()
+    # Find recources. They are loaded in the background or by the scenes that use them
+    Images.indexAll()
+    Sounds.indexAll()
 
     # load first scene
     SceneManager.requestloadScene(LogoScene)
@@ -42,19 +43,22 @@ def main():
         SceneManager.loadNewSceneIfRequested()
 
         dt = clock.tick(FRAME_RATE) / 1000
-        screen.fill(SceneManager.getClearColor())
 
         # updates
         Timer.updateAll(dt)
         Animator.updateAll(dt)
         Component.updateAll(dt)
 
-        # draw
-        SceneManager.drawAll(screen)
+        # draw (only the changed part of the screen)
+        dirtyRects = SceneManager.drawAll(screen)
 
         # load requested components
         SceneManager.createRequestedComponents()
 
+        # take over the assets that were decoded in the background
+        Images.loadPending()
+        Sounds.loadPending()
+
         # catch events
         Input.clearEvents()
         for event in pygame.event.get():
@@ -63,8 +67,11 @@ def main():
             else:
                 Input.enterEvent(event)
 
-        pygame.display.update()
+        pygame.display.update(dirtyRects)
     
+    # show what loading the assets cost
+    AssetLoader.printTimings()
+
     pygame.quit()
 
 
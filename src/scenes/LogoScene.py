@@ -1,12 +1,20 @@
+from components.ui.ProgressBar import ProgressBar
 from scenes.Scene import Scene, SceneManager
 from scenes.menu.MenuScene import MenuScene
+import scenes.game.GameScene
 from utils import *
 
 class LogoScene(Scene):
     """
-    This is the awesome LogoScene. Hier the Mo entertainment logo is presented as a fake loading screen.
+    This is the awesome LogoScene. Hier the Mo entertainment logo is presented while the images of the menu and the game and all sounds are loaded in the background.
+
+    The logo only fades out once loading is done. Until then a bar below the logo shows the progress. See getLoadingProgress.
     """
 
+    IMAGE_MANIFEST = [ "logos.mo" ]
+
+    LOADING_CHECK_INTERVAL = 0.1
+
     def __init__(self) -> None:
         """
         Constructor of the LogoScene class.
@@ -19,15 +27,51 @@ class LogoScene(Scene):
         self.logo.enableScaling = True
         SceneManager.putInDrawLayer(self.logo)
 
+        self.loadingBar = ProgressBar((240, 6), self.getLoadingProgress, transform=Transform.screenCenter(y = 650.))
+        SceneManager.putInDrawLayer(self.loadingBar)
+
         self.logoAnimation = Animator.smoothLerp(0.6, 1., 5)
         self.logoAnimation.setRepeatMode(Animator.PAUSE)
         self.logoAnimation.setHook(lambda s : self.logo.transform.setRelScale((s, s)))
 
-        self.alphaAnimation = Animator.easeOut(0, 255., 1) + Animator.const(255, 4.3) + Animator.easeIn(255, 0, 1)
-        self.alphaAnimation.setHook(self.logo.image.set_alpha)
-        self.alphaAnimation.setEndCallback(lambda : SceneManager.requestloadScene(MenuScene))
+        self.alphaAnimation = Animator.easeOut(0, 255., 1) + Animator.const(255, 4.3)
+        self.alphaAnimation.setHook(self.logo.setAlpha)
+        self.alphaAnimation.addHook(self.loadingBar.setAlpha)
+        self.alphaAnimation.setEndCallback(self.__checkLoading)
+
+        self.disappearAnimation = Animator.easeIn(255, 0, 1)
+        self.disappearAnimation.setHook(self.logo.setAlpha)
+        self.disappearAnimation.addHook(self.loadingBar.setAlpha)
+        self.disappearAnimation.setEndCallback(lambda : SceneManager.requestloadScene(MenuScene))
+
+        self.loadingTimer = Timer(LogoScene.LOADING_CHECK_INTERVAL, self.__checkLoading)
     
+    @classmethod
+    def nextScenes(cls) -> list[type[Scene]]:
+        return [ MenuScene, scenes.game.GameScene.GameScene ]
+
     def start(self) -> None:
         Sounds.playSoundEffect("intro")
+        Sounds.preloadAll()
         self.logoAnimation.play()
-        self.alphaAnimation.play()
\ No newline at end of file
+        self.alphaAnimation.play()
+
+    def getLoadingProgress(self) -> float:
+        """
+        Returns how much of the images and sounds loaded in the background are done.
+
+        Returns:
+            float: The progress between 0 and 1.
+        """
+        imagesDone, images = Images.preloadProgress()
+        soundsDone, sounds = Sounds.loadProgress()
+        return (imagesDone + soundsDone) / max(images + sounds, 1)
+
+    def __checkLoading(self) -> None:
+        """
+        Lets the logo disappear if loading is done. Otherwise it checks again after LOADING_CHECK_INTERVAL.
+        """
+        if self.getLoadingProgress() < 1:
+            self.loadingTimer.start()
+        else:
+            self.disappearAnimation.play()
\ No newline at end of file
@@ -1,10 +1,12 @@
+from collections import Counter
 from typing import Callable
-from weakref import WeakSet
+from weakref import WeakSet, ref
 from components.Component import Component
 import pygame
 import gc
 
 from utils.Animator import Animator
+from utils.Images import Images
 from utils.Timer import Timer
 
 class Scene:
@@ -12,8 +14,12 @@ class Scene:
     A scene is a container for all components (thus logic) that can happen at one time in the game. An actuial scene should 
 
     Eg. One can seperate the hole game into a MenuScene and GameScene which are completely seperate from eachother.
+
+    IMAGE_MANIFEST lists the images the scene uses as shell-style patterns of image keys (see Images.keys). They are loaded before the scene is created.
     """
 
+    IMAGE_MANIFEST : list[str] = []
+
     def __init__(self, clearColor : tuple[int] = (0, 0, 0)):
         """
         In the constructor all components that are used should be created.
@@ -31,6 +37,22 @@ class Scene:
         """
         pass
 
+    def unload(self) -> None:
+        """
+        Will be called before the Scene is destroyed because another one has been loaded.
+        """
+        pass
+
+    @classmethod
+    def nextScenes(cls) -> list[type['Scene']]:
+        """
+        Returns the scenes that may be loaded after this one. Their images are preloaded while this scene runs.
+
+        Returns:
+            list[type[Scene]]: The scene types.
+        """
+        return []
+
     def getClearColor(self) -> tuple[int]:
         """
         Returns the clear color of the scene. This is the color with which the whole screen will be replaced before the drawign of a frame.
@@ -42,11 +64,68 @@ class Scene:
 
 
 
+class DrawRecorder:
+    """
+    Stands in for the screen while the components draw.
+
+    Blits are only recorded, so the SceneManager can find out which parts of the screen changed since the last frame before anything is drawn.
+    Components have to draw with blit. Everything else is forwarded to the screen.
+
+    Attributes:
+        screen (pygame.Surface): The actual screen.
+        blits (list[tuple]): The recorded blits: source, destination rect, area and special flags.
+    """
+
+    def __init__(self, screen : pygame.Surface):
+        """
+        Constructor of the DrawRecorder class.
+
+        Args:
+            screen (pygame.Surface): The actual screen.
+        """
+        self.screen = screen
+        self.blits : list[tuple] = []
+
+    def blit(self, source : pygame.Surface, dest : pygame.Rect | tuple[float], area : pygame.Rect = None, special_flags : int = 0) -> pygame.Rect:
+        """
+        Records a blit. Same parameters as pygame.Surface.blit.
+
+        Returns:
+            pygame.Rect: The area of the screen the blit will change.
+        """
+        size = area.size if area is not None else source.get_size()
+        rect = pygame.Rect(dest.topleft if isinstance(dest, pygame.Rect) else (int(dest[0]), int(dest[1])), size)
+        self.blits.append((source, rect, area, special_flags))
+        return rect.clip(self.screen.get_rect())
+
+    def __getattr__(self, name : str):
+        return getattr(self.screen, name)
+
+    @staticmethod
+    def signature(blit : tuple) -> tuple:
+        """
+        Returns what makes a recorded blit look the way it does. The alpha is included as it can change in place.
+
+        Args:
+            blit (tuple): A recorded blit.
+
+        Returns:
+            tuple: Hashable signature of the blit.
+        """
+        source, rect, area, flags = blit
+        return (id(source), source.get_alpha(), tuple(rect), None if area is None else tuple(area), flags)
+
+
+
 class SceneManager:
     """
     This static class manages Scene creating, loading and destroying.
 
     It is also in charge of drawing and late component creation.
+
+    Only the part of the screen that changed is redrawn each frame. See drawAll.
+
+    Components that barely change can be put in the background (see putInBackground). They are composited into one cached surface that is drawn beneath all draw layers. When a background component changes, only its area is composited again.
     """
 
     __currentScene : Scene = None
@@ -56,6 +135,15 @@ class SceneManager:
 
     __drawables : list[WeakSet[Component]] = [ WeakSet(), WeakSet(), WeakSet() ]
 
+    __background : list[ref] = []
+    __backgroundSurface : pygame.Surface = None
+    __backgroundSignatures : list[tuple] = None
+    __backgroundBlits : list[tuple] = []
+
+    __lastBlits : list[tuple] = []
+    __lastSignatures : Counter = Counter()
+    __fullRedraw : bool = True
+
     MAIN_LAYER = 0
     OVERLAY_LAYER = 1
     SEC_OVERLAY_LAYER = 2
@@ -65,14 +153,26 @@ class SceneManager:
     def loadNewSceneIfRequested() -> None:
         """
         Loads a new scene and destroys the old one if a scene has been requested during the last frame.
+
+        The images of the new scene are loaded first, the ones of the scenes that may come next are queued for preloading (see Images.preload). All other images are evicted.
         """
         if SceneManager.__requestedScene != None:
+            scene = SceneManager.__requestedScene
+            if SceneManager.__currentScene is not None:
+                SceneManager.__currentScene.unload()
             SceneManager.__clearAllInstances()
+
+            # only keep the images of this and the next scenes
+            nextManifest = [ pattern for nextScene in scene.nextScenes() for pattern in nextScene.IMAGE_MANIFEST ]
+            Images.evict(scene.IMAGE_MANIFEST + nextManifest)
+            Images.load(scene.IMAGE_MANIFEST)
             
-            SceneManager.__currentScene = SceneManager.__requestedScene()
+            SceneManager.__currentScene = scene()
             SceneManager.__currentScene.start()
+            Images.preload(nextManifest)
 
             SceneManager.__requestedScene = None
+            SceneManager.__fullRedraw = True
 
             # garbage collect all unnecessary instances in regestries
             gc.collect()
@@ -88,6 +188,11 @@ class SceneManager:
 
         SceneManager.__drawables = [ WeakSet(), WeakSet(), WeakSet() ]
 
+        SceneManager.__background = []
+        SceneManager.__backgroundSurface = None
+        SceneManager.__backgroundSignatures = None
+        SceneManager.__backgroundBlits = []
+
     
     @staticmethod
     def requestloadScene(scene : type[Scene]) -> None:
@@ -123,16 +228,117 @@ class SceneManager:
             SceneManager.__drawables[layer].add(c)
     
     @staticmethod
-    def drawAll(screen : pygame.Surface) -> None:
+    def putInBackground(c : Component | list[Component]) -> None:
+        """
+        Registers a component or a list of components as static background.
+
+        The background is composited once into an off-screen surface and drawn beneath all draw layers in one blit. When a background component draws something different, only the area of its old and new blits is composited again.
+        So animated components can be put in the background too, as long as they are small or only animate for a while. Background components are drawn in the order they were put in.
+
+        Args:
+            c (Component | list[Component]): The component or the list of components that should be put in the background.
+        """
+        for x in (c if isinstance(c, list) else [ c ]):
+            SceneManager.__background.append(ref(x))
+
+    @staticmethod
+    def __drawBackground(screen : pygame.Surface) -> list[tuple]:
+        """
+        Records the blits of the background components and composites the area that changed again.
+
+        Args:
+            screen (pygame.Surface): The screen surface.
+
+        Returns:
+            list[tuple]: The recorded blits of the background components.
+        """
+        recorder = DrawRecorder(screen)
+        SceneManager.__background = [ r for r in SceneManager.__background if r() is not None ]
+        for r in SceneManager.__background:
+            r().draw(recorder)
+
+        signatures = [ DrawRecorder.signature(blit) for blit in recorder.blits ]
+        if SceneManager.__backgroundSurface is None or SceneManager.__backgroundSurface.get_size() != screen.get_size():
+            SceneManager.__backgroundSurface = pygame.Surface(screen.get_size(), 0, screen)
+            dirtyRect = screen.get_rect()
+
+        elif signatures != SceneManager.__backgroundSignatures:
+            new, old = Counter(signatures), Counter(SceneManager.__backgroundSignatures)
+            changed = (new - old) + (old - new)
+            dirtyRects = [ blit[1] for blit in recorder.blits + SceneManager.__backgroundBlits if DrawRecorder.signature(blit) in changed ]
+
+            # only the order changed
+            if len(dirtyRects) == 0:
+                dirtyRect = screen.get_rect()
+            else:
+                dirtyRect = dirtyRects[0].unionall(dirtyRects[1:]).clip(screen.get_rect())
+
+        else:
+            dirtyRect = None
+
+        if dirtyRect is not None:
+            background = SceneManager.__backgroundSurface
+            background.set_clip(dirtyRect)
+            background.fill(SceneManager.getClearColor())
+            for source, rect, area, flags in recorder.blits:
+                if rect.colliderect(dirtyRect):
+                    background.blit(source, rect, area, flags)
+            background.set_clip(None)
+
+        # the old blits are kept so their surfaces (and ids) stay alive
+        SceneManager.__backgroundSignatures = signatures
+        SceneManager.__backgroundBlits = recorder.blits
+
+        return recorder.blits
+
+    @staticmethod
+    def drawAll(screen : pygame.Surface) -> list[pygame.Rect]:
         """
         Draws all registered components on the specified order (see putInDrawLayer) to the screen.
 
+        The components draw to a DrawRecorder first. The blits that are new or gone since the last frame make up the dirty rect.
+        Only the union of those is drawn again, starting with the cached background. After a scene change the whole screen is redrawn.
+
         Args:
             screen (pygame.Surface): The screen surface which the components will be drawn to.
+
+        Returns:
+            list[pygame.Rect]: The changed area of the screen. Empty if nothing changed. Can be passed to pygame.display.update.
         """
+        backgroundBlits = SceneManager.__drawBackground(screen)
+
+        recorder = DrawRecorder(screen)
         for layerSet in SceneManager.__drawables:
             for c in layerSet:
-                c.draw(screen)
+                c.draw(recorder)
+
+        blits = backgroundBlits + recorder.blits
+        signatures = Counter(DrawRecorder.signature(blit) for blit in blits)
+
+        if SceneManager.__fullRedraw:
+            dirtyRects = [ screen.get_rect() ]
+            SceneManager.__fullRedraw = False
+        else:
+            changed = (signatures - SceneManager.__lastSignatures) + (SceneManager.__lastSignatures - signatures)
+            dirtyRects = [ blit[1] for blit in blits + SceneManager.__lastBlits if DrawRecorder.signature(blit) in changed ]
+
+        # the old blits are kept so their surfaces (and ids) stay alive
+        SceneManager.__lastBlits = blits
+        SceneManager.__lastSignatures = signatures
+
+        if len(dirtyRects) == 0:
+            return []
+
+        dirtyRect = dirtyRects[0].unionall(dirtyRects[1:]).clip(screen.get_rect())
+
+        screen.set_clip(dirtyRect)
+        screen.blit(SceneManager.__backgroundSurface, dirtyRect, dirtyRect)
+        for source, rect, area, flags in recorder.blits:
+            if rect.colliderect(dirtyRect):
+                screen.blit(source, rect, area, flags)
+        screen.set_clip(None)
+
+        return [ dirtyRect ]
     
     @staticmethod
     def getClearColor() -> tuple[int]:
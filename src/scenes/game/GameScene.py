@@ -9,6 +9,7 @@ from components.ui.SettingsSign import SettingsSign
 from scenes.Scene import Scene, SceneManager
 from scenes.game.ShipPlacer import Ship, ShipPlacer
 from scenes.game.TargetSelector import TargetSelector
+import scenes.menu.MenuScene
 from utils.Animator import Animator
 from utils.Images import Sprite
 from utils.Input import Input
@@ -21,6 +22,8 @@ class GameScene(Scene):
     This is the game scene. Here all the fun stuff hapens.
     """
 
+    IMAGE_MANIFEST = [ "game.*", "signs.*", "buttons.spielen", "buttons.settings", "buttons.back", "buttons.checkbox_*", "ambient.land3", "ambient.island*", "ambient.bird*", "ambient.shark*" ]
+
     START_ANIM_TIME = 4. # TODO: 3.5
     
     def __init__(self):
@@ -35,7 +38,7 @@ class GameScene(Scene):
 
         self.landParent = Transform()
         self.land = Sprite("ambient.land3", Transform.screenCenter(y = 87.5, scale=(0.5, 0.5), parent=self.landParent), bakeNow=True)
-        SceneManager.putInDrawLayer(self.land)
+        SceneManager.putInBackground(self.land)
 
         self.landAppearAnim = Animator.easeOut(-280, 0, GameScene.START_ANIM_TIME)
         self.landAppearAnim.setHook(self.landParent.setRelYPos)
@@ -43,11 +46,11 @@ class GameScene(Scene):
 
         self.board1 = Sprite("game.board", Transform((250, 520), scale=(0.4, 0.4)), bakeNow=True)
         self.board2 = Sprite("game.board", Transform((770, 520), scale=(0.4, 0.4)), bakeNow=True)
-        SceneManager.putInDrawLayer([ self.board1, self.board2])
+        SceneManager.putInBackground([ self.board1, self.board2])
 
         self.boardAppearAnim = Animator.smoothLerp(0., 150., GameScene.START_ANIM_TIME)
-        self.boardAppearAnim.setHook(self.board1.image.set_alpha)
-        self.boardAppearAnim.addHook(self.board2.image.set_alpha)
+        self.boardAppearAnim.setHook(self.board1.setAlpha)
+        self.boardAppearAnim.addHook(self.board2.setAlpha)
         self.boardAppearAnim.play()
 
         placementDoneBtn = ImageButton("buttons.spielen", transform = Transform.screenCenter(y=200., scale=(0.2, 0.2)))
@@ -125,12 +128,18 @@ class GameScene(Scene):
         self.islands = [
             Diashow([ "ambient.island1", "ambient.island2" ], 0.5, transform=Transform((530, 200), scale=(0.3, 0.3), parent=self.landParent)),
         ]
-        SceneManager.putInDrawLayer(self.islands)
+        SceneManager.putInBackground(self.islands)
 
         self.shark = Shark(0.3, pygame.Rect(500, 300, 24, 500), (7., 15.), transform=Transform(scale=(0.3, 0.3)))
         SceneManager.putInDrawLayer(self.shark)
 
 
+    @classmethod
+    def nextScenes(cls) -> list[type[Scene]]:
+        return [ scenes.menu.MenuScene.MenuScene ]
+
+    def unload(self) -> None:
+        self.targetSelector.shutdown()
     
     def __placementDoneCallback(self):
         """
@@ -121,7 +121,7 @@ class ShipPlacer(Component):
 
             pos, angle = Ship.getPositionAndRotationFromShape(hoverShape, self.boardRect, self.boardSize)
             self.hoverSprite.transform.setRelPosition(pos)
-            self.hoverSprite.image.set_alpha(255 if isValidHoverPos else 100)
+            self.hoverSprite.setAlpha(255 if isValidHoverPos else 100)
 
             if mouseEvent is not None and (4 <= mouseEvent.button <= 5):
                 self.hoverSprite.transform.setRelAngle(angle)
@@ -1,8 +1,12 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Callable
 import pygame
+import time
 from ai.AiMaster import AiMaster
 from ai.Board import Board
 from ai.Difficulties import Difficulties
+from ai.GameRecord import GameRecord
+from ai.ReplayStore import ReplayStore
 from ai.ShipPlacement import ShipPlacement
 from ai.ShipShape import ShipShape
 from components.Component import Component
@@ -20,9 +24,24 @@ from utils.Transform import Transform
 class TargetSelector(Component):
     """
     Represents the second phase of the game. Here the shoting happens.
+
+    The ai runs on a worker thread so that slow ais don't stall the frames. All calls to the ai are queued there in order, so it is only used by one thread.
+    While the computer's cannon ball flies, the ai already speculates on the next shot. The outcome is only submitted on impact.
+
+    Every finished game is recorded and appended to the ReplayStore. The store is opened once and written on its own worker thread, so the frames don't wait for the disk.
+
+    Attributes:
+        aiTurnLatencies (list[float]): For every computer's turn, how long the game waited for the ai's shot in seconds. They are printed when the game ended, see printAiTurnLatencies.
+        record (GameRecord): The record of the current game. Player 0 is the player, player 1 the computer.
     """
 
+    PLAYER = 0
+    COMPUTER = 1
+
     TOTAL_SHIP_TILES = 5 * 1 + 4 * 2 + 3 * 3 + 2 * 4
+
+    __replayStore : ReplayStore = None
+    __replayExecutor = ThreadPoolExecutor(max_workers=1)
     
     def __init__(self, boardSize : int, ownBoardRect : pygame.Rect, oppositeBoardRect : pygame.Rect, ownCannon : Cannon, oppositeCannon : Cannon, gameEndCallback : Callable[[bool], None]):
         """
@@ -41,7 +60,7 @@ class TargetSelector(Component):
         self.ownBoardRect = ownBoardRect
         self.oppositeBoardRect = oppositeBoardRect
         self.ownShipPlacement = []
-        self.ai = AiMaster(boardSize, boardSize, Difficulties.getSelectedChanceOfMistake(), Difficulties.getSelectedNumShipPlacementTries(), Difficulties.doesSelecteduseProAi())
+        self.ai = AiMaster(boardSize, boardSize, Difficulties.getSelectedChanceOfMistake(), Difficulties.getSelectedNumShipPlacementTries(), Difficulties.getSelectedComputeBudgetMs(), useProAi=Difficulties.doesSelectedUseProAi())
         self.oppositeShipPlacement = None
         self.selecting = False
         self.cross = Sprite("game.cross", transform=Transform(scale=(0.5, 0.5)), bakeNow=True)
@@ -56,6 +75,12 @@ class TargetSelector(Component):
         self.gameEndcallback = gameEndCallback
         self.playerFoundShipTiles = 0
         self.aiFoundShipTiles     = 0
+        self.aiExecutor = ThreadPoolExecutor(max_workers=1)
+        self.aiShotFuture : Future = None
+        self.aiShotRequestTime = 0.
+        self.aiShotCell : tuple[int] = None
+        self.aiTurnLatencies : list[float] = []
+        self.record = GameRecord(boardSize, boardSize)
 
     def setOwnShipPlacement(self, shipPlacement : list[ShipShape]) -> None:
         """
@@ -67,6 +92,7 @@ class TargetSelector(Component):
             shipPlacement (list[ShipShape]): The player's ship placement.
         """
         self.ownShipPlacement = ShipPlacement(shipPlacement)
+        self.record.setFleet(TargetSelector.PLAYER, self.ownShipPlacement)
     
     def start(self) -> None:
         """
@@ -75,6 +101,7 @@ class TargetSelector(Component):
         Whether the computer or player starts will be randomly selected with equal odds.
         """
         self.oppositeShipPlacement = self.ai.generateShipPlacement()
+        self.record.setFleet(TargetSelector.COMPUTER, self.oppositeShipPlacement)
         if random.random() >= 0.5:
             self.doOwnShot()
         else:
@@ -93,12 +120,25 @@ class TargetSelector(Component):
         """
         Executes a computer's shot.
 
-        The computer will shoot immediatly.
+        The shot is calculated on a worker thread. The computer shoots as soon as the result is ready. (See update)
         """
         self.aiTurn = True
-        cell = self.ai.getNextShot()
-        cellState = Board.SHIP if self.ownShipPlacement.cellOccupied(cell) else Board.CHECKED_NO_SHIP
-        self.ai.submitInfo(cell, cellState)
+        self.aiShotRequestTime = time.perf_counter()
+        self.aiShotFuture = self.aiExecutor.submit(self.ai.getNextShot)
+
+    def finishOppositeShot(self, cell : tuple[int]) -> None:
+        """
+        Fires the computer's shot once the ai has calculated it. The ai speculates on the outcome during the flight.
+
+        It also records how long the turn waited for the ai.
+
+        Args:
+            cell (tuple[int]): The cell the ai wants to shoot at.
+        """
+        self.aiTurnLatencies.append(time.perf_counter() - self.aiShotRequestTime)
+
+        self.aiShotCell = cell
+        self.aiExecutor.submit(self.ai.speculate, cell)
 
         self.fireShot(cell)
 
@@ -133,6 +173,11 @@ class TargetSelector(Component):
     def update(self, dt: float) -> None:
         self.drawCross = False
 
+        if self.aiShotFuture is not None and self.aiShotFuture.done():
+            cell = self.aiShotFuture.result()
+            self.aiShotFuture = None
+            self.finishOppositeShot(cell)
+
         if not Input.checkInputLayer(Input.GAME_LAYER):
             return
 
@@ -160,14 +205,13 @@ class TargetSelector(Component):
             self.oppositeCannon.animation.play()
             endPos = self.getPosFromCell(cell, self.ownBoardRect)
             hit = self.ownShipPlacement.cellOccupied(cell)
-
-            self.ai.printState()
         else:
             startPos = self.ownCannon.getOpeningPos()
             self.ownCannon.animation.play()
             endPos = self.getPosFromCell(cell, self.oppositeBoardRect)
             hit = self.oppositeShipPlacement.cellOccupied(cell)
 
+        self.record.addShot(TargetSelector.COMPUTER if self.aiTurn else TargetSelector.PLAYER, cell, hit)
         self.cannonBall.fire(startPos, endPos, hit)
     
     def shotAnimationFinished(self, pos : tuple[float], hit : bool) -> None:
@@ -178,6 +222,9 @@ class TargetSelector(Component):
             pos (tuple[float]): Screen position where the shot hit.
             hit (bool): Whether the shot hit a ship.
         """
+        if self.aiTurn:
+            self.aiExecutor.submit(self.ai.submitInfo, self.aiShotCell, Board.SHIP if hit else Board.CHECKED_NO_SHIP)
+
         if hit:
             def createFire():
                 self.fires.append(Fire(transform=Transform(pos, scale=(0.4, 0.4))))
@@ -188,12 +235,18 @@ class TargetSelector(Component):
             if self.aiTurn:
                 self.aiFoundShipTiles += 1
                 if self.aiFoundShipTiles == TargetSelector.TOTAL_SHIP_TILES:
+                    self.saveRecord(TargetSelector.COMPUTER)
+                    self.printAiTurnLatencies()
+                    self.shutdown()
                     self.gameEndcallback(False)
                     return
             
             else:
                 self.playerFoundShipTiles += 1
                 if self.playerFoundShipTiles == TargetSelector.TOTAL_SHIP_TILES:
+                    self.saveRecord(TargetSelector.PLAYER)
+                    self.printAiTurnLatencies()
+                    self.shutdown()
                     self.gameEndcallback(True)
                     return
         
@@ -208,6 +261,49 @@ class TargetSelector(Component):
         else:
             self.doOppositeShot()
 
+    def saveRecord(self, winner : int) -> None:
+        """
+        Appends the record of the finished game to the ReplayStore on the worker thread of the store.
+
+        Args:
+            winner (int): The player that won. Either PLAYER or COMPUTER.
+        """
+        self.record.setWinner(winner)
+        TargetSelector.__replayExecutor.submit(TargetSelector.__appendRecord, self.record)
+
+    @staticmethod
+    def __appendRecord(record : GameRecord) -> None:
+        """
+        Appends a record to the ReplayStore. The store is opened by the first record and then kept open.
+
+        Args:
+            record (GameRecord): The record of a finished game.
+        """
+        if TargetSelector.__replayStore is None:
+            TargetSelector.__replayStore = ReplayStore()
+        TargetSelector.__replayStore.append(record)
+
+    def printAiTurnLatencies(self) -> None:
+        """
+        Prints how long the computer's turns waited for the ai: the median, the slowest turn and the total.
+        """
+        if not self.aiTurnLatencies:
+            return
+
+        latencies = sorted(self.aiTurnLatencies)
+        median = latencies[len(latencies) // 2]
+        print(f"ai turn latency over {len(latencies)} turns: median {median * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms, total {sum(latencies) * 1000:.1f} ms")
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker thread of the ai and its speculation. A shot that is still being calculated is dropped.
+
+        This will be called when the game ended or the scene is unloaded.
+        """
+        self.aiExecutor.shutdown(wait=False, cancel_futures=True)
+        self.aiShotFuture = None
+        self.ai.shutdown()
+
     def draw(self, screen: pygame.Surface) -> None:
         if self.drawCross:
             self.cross.draw(screen)
@@ -36,8 +36,8 @@ class DifficultySelect(Component):
         self.nameImages = [ Sprite(img, Transform(scale=DifficultySelect.NAME_SCALE, parent=self.transform), bakeNow=True) for img in Difficulties.allNameImages() ]
         self.descitpionImages = [ Sprite(img, Transform((0, 100), scale=DifficultySelect.DESCRIPTION_SCALE, parent=self.transform), bakeNow=True) for img in Difficulties.allDescriptionIamges() ]
         for i in range(1, len(self.nameImages)):
-            self.nameImages[i].image.set_alpha(0)
-            self.descitpionImages[i].image.set_alpha(0)
+            self.nameImages[i].setAlpha(0)
+            self.descitpionImages[i].setAlpha(0)
         SceneManager.putInDrawLayer(self.nameImages)
         SceneManager.putInDrawLayer(self.descitpionImages)
         
@@ -70,14 +70,14 @@ class DifficultySelect(Component):
         self.skipAnimations()
 
         self.disappearLeftMove.setHook(self.nameImages[self.selectedIndex].transform.setRelPosition)
-        self.disappearAlpha.setHook(self.nameImages[self.selectedIndex].image.set_alpha)
-        self.desDisppear.setHook(self.descitpionImages[self.selectedIndex].image.set_alpha)
+        self.disappearAlpha.setHook(self.nameImages[self.selectedIndex].setAlpha)
+        self.desDisppear.setHook(self.descitpionImages[self.selectedIndex].setAlpha)
 
         self.selectedIndex = (self.selectedIndex + 1) % len(self.nameImages)
 
         self.appearRightMove.setHook(self.nameImages[self.selectedIndex].transform.setRelPosition)
-        self.appearAlpha.setHook(self.nameImages[self.selectedIndex].image.set_alpha)
-        self.desAppear.setHook(self.descitpionImages[self.selectedIndex].image.set_alpha)
+        self.appearAlpha.setHook(self.nameImages[self.selectedIndex].setAlpha)
+        self.desAppear.setHook(self.descitpionImages[self.selectedIndex].setAlpha)
 
         self.disappearLeftMove.replay()
         self.disappearAlpha.replay()
@@ -98,14 +98,14 @@ class DifficultySelect(Component):
         self.skipAnimations()
 
         self.disappearRightMove.setHook(self.nameImages[self.selectedIndex].transform.setRelPosition)
-        self.disappearAlpha.setHook(self.nameImages[self.selectedIndex].image.set_alpha)
-        self.desDisppear.setHook(self.descitpionImages[self.selectedIndex].image.set_alpha)
+        self.disappearAlpha.setHook(self.nameImages[self.selectedIndex].setAlpha)
+        self.desDisppear.setHook(self.descitpionImages[self.selectedIndex].setAlpha)
 
         self.selectedIndex = (self.selectedIndex - 1 + len(self.nameImages)) % len(self.nameImages)
 
         self.appearLeftMove.setHook(self.nameImages[self.selectedIndex].transform.setRelPosition)
-        self.appearAlpha.setHook(self.nameImages[self.selectedIndex].image.set_alpha)
-        self.desAppear.setHook(self.descitpionImages[self.selectedIndex].image.set_alpha)
+        self.appearAlpha.setHook(self.nameImages[self.selectedIndex].setAlpha)
+        self.desAppear.setHook(self.descitpionImages[self.selectedIndex].setAlpha)
 
         self.disappearRightMove.replay()
         self.disappearAlpha.replay()
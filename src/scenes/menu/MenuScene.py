@@ -19,6 +19,8 @@ class MenuScene(Scene):
     This is the manu scene. Here you can select the difficulty of your game.
     """
 
+    IMAGE_MANIFEST = [ "texts.*", "buttons.*", "signs.settings", "ambient.island*", "ambient.bird*", "ambient.shark*" ]
+
     def __init__(self):
         """
         Constructor of the GameScene class.
@@ -35,7 +37,7 @@ class MenuScene(Scene):
         self.gameStartAnimation.setEndCallback(self.startGame)
 
         self.headingSprite = Sprite("texts.seeschlacht", Transform.screenCenter(y = 100., scale=(0.5, 0.5), parent=self.parentTransform), bakeNow=True)
-        SceneManager.putInDrawLayer(self.headingSprite)
+        SceneManager.putInBackground(self.headingSprite)
 
         # self.gengnerSprite = Sprite("texts.gegner", Transform.screenCenter(y=230., scale=(0.3, 0.3), parent=self.parentTransform), bakeNow=True)
         # SceneManager.putInDrawLayer(self.gengnerSprite, SceneManager.UI_MAIN_LAYER)
@@ -46,7 +48,7 @@ class MenuScene(Scene):
             Diashow([ "ambient.island1", "ambient.island2" ], 0.5, transform=Transform((100, 200), scale=(0.4, 0.4), parent=self.parentTransform)),
             Diashow([ "ambient.island2", "ambient.island1" ], 0.5, transform=Transform((800, 650), scale=(0.4, 0.4), parent=self.parentTransform)) 
         ]
-        SceneManager.putInDrawLayer(self.islands)
+        SceneManager.putInBackground(self.islands)
 
         self.playBtn = ImageButton("buttons.spielen", transform = Transform.screenCenter(y=600., scale=(0.3, 0.3), parent=self.parentTransform))
         self.playBtn.setOnClickEvent(self.gameStartAnimation.play)
@@ -72,6 +74,10 @@ class MenuScene(Scene):
 
 
     
+    @classmethod
+    def nextScenes(cls) -> list[type[Scene]]:
+        return [ scenes.game.GameScene.GameScene ]
+
     def startGame(self):
         """
         Callback that gets called when the game starting animation finished.
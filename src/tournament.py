@@ -0,0 +1,337 @@
+
+# version check
+import sys
+if sys.version_info.major < 3 or sys.version_info.minor < 10:
+    raise Exception("Must be using Python 3.10 or higher")
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from ai.AiMaster import AiMaster
+from ai.Board import Board
+from ai.Difficulties import Difficulties
+from ai.GameRecord import GameRecord
+from ai.ReplayStore import ReplayStore
+from ai.ShipPlacement import ShipPlacement
+
+BOARD_SIZE = 11
+NUM_SHIPS = {2: 4, 3: 3, 4: 2, 5: 1}
+DEFAULT_GAMES_PER_PAIR = 20
+DEFAULT_CHECKPOINT = "tournament_checkpoint.jsonl"
+
+
+class AiConfig:
+    """
+    Represents one ai configuration that takes part in the tournament.
+
+    Attributes:
+        name (str): Unique name of the configuration.
+        chanceOfMistake (float): Likelyhood of a random shot. 1 means only the Random Ai is used.
+        numShipPlacementTries (int): How many tries the ShipPlacing Ai has.
+        computeBudgetMs (float): Compute budget per shot.
+        useBruteForce (bool): Whether the BruteForce Ai is used.
+        useProAi (bool): Whether the Pro Ai is used.
+    """
+
+    def __init__(self, name : str, chanceOfMistake : float = 0., numShipPlacementTries : int = 1, computeBudgetMs : float = 0., useBruteForce : bool = True, useProAi : bool = False):
+        """
+        Constructor of the AiConfig class.
+
+        Args:
+            name (str): Unique name of the configuration.
+            chanceOfMistake (float, optional): Likelyhood of a random shot. Defaults to 0.
+            numShipPlacementTries (int, optional): How many tries the ShipPlacing Ai has. Defaults to 1.
+            computeBudgetMs (float, optional): Compute budget per shot. Defaults to 0.
+            useBruteForce (bool, optional): Whether the BruteForce Ai is used. Defaults to True.
+            useProAi (bool, optional): Whether the Pro Ai is used. Defaults to False.
+        """
+        self.name = name
+        self.chanceOfMistake = chanceOfMistake
+        self.numShipPlacementTries = numShipPlacementTries
+        self.computeBudgetMs = computeBudgetMs
+        self.useBruteForce = useBruteForce
+        self.useProAi = useProAi
+
+    def create(self) -> AiMaster:
+        """
+        Creates an AiMaster with this configuration.
+
+        Returns:
+            AiMaster: The newly created ai.
+        """
+        return AiMaster(BOARD_SIZE, BOARD_SIZE, self.chanceOfMistake, self.numShipPlacementTries, self.computeBudgetMs, NUM_SHIPS, self.useBruteForce, self.useProAi)
+
+    @classmethod
+    def difficulties(cls) -> list['AiConfig']:
+        """
+        Creates the configurations of all entries in Difficulties.
+
+        Returns:
+            list[AiConfig]: One configuration per difficulty.
+        """
+        return [
+            cls(name, Difficulties.getChanceOfMistake(i), Difficulties.getNumShipPlacementTries(i), Difficulties.getComputeBudgetMs(i), useProAi=Difficulties.doesUseProAi(i))
+            for i, name in enumerate(Difficulties.allNames())
+        ]
+
+    @classmethod
+    def fromSpec(cls, spec : str) -> 'AiConfig':
+        """
+        Parses a custom configuration.
+
+        The format is name:key=value,key=value. Possible keys are mistake, tries, budget, bruteForce (0 or 1) and pro (0 or 1).
+        Eg.: "pro50:mistake=0,budget=50,bruteForce=0,pro=1"
+
+        Args:
+            spec (str): The specification.
+
+        Raises:
+            ValueError: If a key is unknown.
+
+        Returns:
+            AiConfig: The parsed configuration.
+        """
+        name, _, options = spec.partition(":")
+        config = cls(name)
+
+        for option in filter(None, options.split(",")):
+            key, _, value = option.partition("=")
+            if key == "mistake":
+                config.chanceOfMistake = float(value)
+            elif key == "tries":
+                config.numShipPlacementTries = int(value)
+            elif key == "budget":
+                config.computeBudgetMs = float(value)
+            elif key == "bruteForce":
+                config.useBruteForce = bool(int(value))
+            elif key == "pro":
+                config.useProAi = bool(int(value))
+            else:
+                raise ValueError(f"Unknown option '{key}' in ai configuration '{spec}'")
+
+        return config
+
+
+def sinkFleet(ai : AiMaster, fleet : ShipPlacement, record : GameRecord, player : int) -> tuple[int, float]:
+    """
+    Lets an ai shoot at a fleet until all ships are sunk.
+
+    The ai is shut down before the cpu time is read, so its background threads don't run on into the other side's time or later games.
+
+    Args:
+        ai (AiMaster): The shooting ai.
+        fleet (ShipPlacement): The fleet to sink.
+        record (GameRecord): Record where the shots are stored.
+        player (int): The shooting player in the record.
+
+    Returns:
+        int: The number of shots needed.
+        float: The cpu time used for the shots in seconds.
+    """
+    totalShipTiles = sum(length * count for length, count in NUM_SHIPS.items())
+    foundShipTiles = 0
+    shots = 0
+
+    startTime = time.process_time()
+
+    while foundShipTiles < totalShipTiles:
+        cell = ai.getNextShot()
+        hit = fleet.cellOccupied(cell)
+        ai.submitInfo(cell, Board.SHIP if hit else Board.CHECKED_NO_SHIP)
+        record.addShot(player, cell, hit)
+
+        foundShipTiles += hit
+        shots += 1
+
+    ai.shutdown()
+    return shots, time.process_time() - startTime
+
+
+def playGame(configA : AiConfig, configB : AiConfig, seed : int) -> dict:
+    """
+    Plays one game between two ai configurations.
+
+    As the shots of one side don't influence the other side, both sides sink their opponent's fleet one after another. Each side is shut down after its turn (see sinkFleet), so their cpu times don't mix.
+    configA starts if the seed is even. So it wins if it needs at most as many shots as configB, otherwise it needs strictly less.
+
+    Args:
+        configA (AiConfig): The first configuration.
+        configB (AiConfig): The second configuration.
+        seed (int): Seed of the game.
+
+    Returns:
+        dict: The result with the keys winner (0 or 1), shots and cpu (one entry per side) and record (GameRecord).
+    """
+    random.seed(seed)
+    np.random.seed(seed % (1 << 32))
+
+    aiA = configA.create()
+    aiB = configB.create()
+
+    record = GameRecord(BOARD_SIZE, BOARD_SIZE)
+    fleetA = aiA.generateShipPlacement()
+    fleetB = aiB.generateShipPlacement()
+    record.setFleet(0, fleetA)
+    record.setFleet(1, fleetB)
+
+    shotsA, cpuA = sinkFleet(aiA, fleetB, record, 0)
+    shotsB, cpuB = sinkFleet(aiB, fleetA, record, 1)
+
+    aStarts = seed % 2 == 0
+    winner = 0 if shotsA < shotsB or (shotsA == shotsB and aStarts) else 1
+    record.setWinner(winner)
+
+    return { "winner": winner, "shots": [ shotsA, shotsB ], "cpu": [ cpuA, cpuB ], "record": record }
+
+
+def silenceOutput() -> None:
+    """
+    Initializer of the worker processes. The ais print their state, which would flood the console.
+    """
+    sys.stdout = open(os.devnull, "w")
+
+
+def loadCheckpoint(path : str) -> dict[str, dict]:
+    """
+    Loads all finished games from a checkpoint file.
+
+    Args:
+        path (str): Path of the checkpoint file.
+
+    Returns:
+        dict[str, dict]: The results by game key.
+    """
+    results = {}
+    if not os.path.exists(path):
+        return results
+
+    with open(path) as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # incomplete last line of an interrupted run
+                continue
+            results[entry["key"]] = entry
+
+    return results
+
+
+def runTournament(configs : list[AiConfig], gamesPerPair : int, workers : int, checkpointPath : str, store : ReplayStore = None) -> dict[str, dict]:
+    """
+    Plays every pair of configurations against each other on a process pool.
+
+    Every finished game is appended to the checkpoint file, so an interrupted tournament continues where it stopped.
+    The seed of a game is derived from its key (the names of both configurations and the game number). So a game is the same no matter which other configurations take part.
+
+    Args:
+        configs (list[AiConfig]): All configurations.
+        gamesPerPair (int): How many games every pair plays.
+        workers (int): Number of worker processes.
+        checkpointPath (str): Path of the checkpoint file.
+        store (ReplayStore, optional): If set, all games are recorded in it. Defaults to None.
+
+    Returns:
+        dict[str, dict]: The results of all games by game key.
+    """
+    results = loadCheckpoint(checkpointPath)
+    print(f"{len(results)} games loaded from {checkpointPath}")
+
+    tasks = []
+    for configA, configB in itertools.combinations(configs, 2):
+        for game in range(gamesPerPair):
+            key = f"{configA.name}|{configB.name}|{game}"
+            if key not in results:
+                tasks.append((key, configA, configB, zlib.crc32(key.encode())))
+
+    with open(checkpointPath, "a") as checkpoint, ProcessPoolExecutor(workers, initializer=silenceOutput) as pool:
+        futures = { pool.submit(playGame, configA, configB, seed): (key, configA, configB) for key, configA, configB, seed in tasks }
+
+        for done, future in enumerate(as_completed(futures), 1):
+            key, configA, configB = futures[future]
+            result = future.result()
+
+            if store is not None:
+                store.append(result.pop("record"))
+            else:
+                result.pop("record")
+
+            entry = { "key": key, "configs": [ configA.name, configB.name ], **result }
+            results[key] = entry
+            checkpoint.write(json.dumps(entry) + "\n")
+            checkpoint.flush()
+
+            print(f"\r{done}/{len(tasks)} games played", end="")
+
+    print()
+    return results
+
+
+def printReport(configs : list[AiConfig], results : dict[str, dict]) -> None:
+    """
+    Prints win rates, shots and cpu times of every configuration.
+
+    The configurations are sorted by strength per cpu second (win rate divided by cpu time per game).
+
+    Args:
+        configs (list[AiConfig]): All configurations.
+        results (dict[str, dict]): The results of all games.
+    """
+    stats = { config.name: { "games": 0, "wins": 0, "shots": 0, "cpu": 0. } for config in configs }
+
+    for entry in results.values():
+        for side, name in enumerate(entry["configs"]):
+            if name not in stats:
+                continue
+            stats[name]["games"] += 1
+            stats[name]["wins"]  += entry["winner"] == side
+            stats[name]["cpu"]   += entry["cpu"][side]
+            stats[name]["shots"] += entry["shots"][side]
+
+    rows = []
+    for name, s in stats.items():
+        if s["games"] == 0:
+            continue
+        winRate = s["wins"] / s["games"]
+        cpuPerGame = s["cpu"] / s["games"]
+        avgShots = s["shots"] / s["games"]
+        rows.append((name, s["games"], winRate, avgShots, cpuPerGame, s["cpu"] / max(s["shots"], 1), winRate / max(cpuPerGame, 1e-9)))
+
+    rows.sort(key=lambda row: row[6], reverse=True)
+
+    print(f"{'config':<20} {'games':>6} {'win rate':>9} {'avg shots':>10} {'cpu/game':>10} {'cpu/shot':>10} {'wins/cpu s':>11}")
+    for name, games, winRate, avgShots, cpuPerGame, cpuPerShot, strength in rows:
+        print(f"{name:<20} {games:>6} {winRate:>9.1%} {avgShots:>10.1f} {cpuPerGame * 1000:>8.1f}ms {cpuPerShot * 1000:>8.2f}ms {strength:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays every pair of ai configurations against each other.")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES_PER_PAIR, help="games per pair")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="file where finished games are stored to resume later")
+    parser.add_argument("--config", action="append", default=[], help="custom configuration: name:mistake=0.1,tries=1,budget=50,bruteForce=1,pro=1")
+    parser.add_argument("--no-difficulties", action="store_true", help="don't include the Difficulties entries")
+    parser.add_argument("--no-record", action="store_true", help="don't store the games in the ReplayStore")
+    args = parser.parse_args()
+
+    configs = ([] if args.no_difficulties else AiConfig.difficulties()) + [ AiConfig.fromSpec(spec) for spec in args.config ]
+    if len(configs) < 2:
+        parser.error("at least 2 configurations are needed")
+
+    store = None if args.no_record else ReplayStore()
+    results = runTournament(configs, args.games, args.workers, args.checkpoint, store)
+    if store is not None:
+        store.close()
+
+    printReport(configs, results)
+
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+import os
+import time
+
+
+class AssetLoader:
+    """
+    Static class that decodes asset files on a thread pool.
+
+    Loading an asset has two steps: read runs on a worker thread and should do the heavy decoding, finish runs on the thread that waits for the asset (usually the main thread) and does what must not happen elsewhere, like converting surfaces for the screen.
+    Both steps are timed per asset. See printTimings.
+    """
+
+    MAX_WORKERS = 4
+
+    __executor : ThreadPoolExecutor = None
+
+    # name => [ seconds reading, seconds finishing ]
+    __timings : dict[str, list[float]] = {}
+
+    @staticmethod
+    def submit(name : str, read : Callable[[], Any]) -> Future:
+        """
+        Starts reading an asset on the thread pool.
+
+        Args:
+            name (str): Name of the asset in the timings.
+            read (Callable[[], Any]): Reads the asset.
+
+        Returns:
+            Future: Will hold the result of read.
+        """
+        if AssetLoader.__executor is None:
+            AssetLoader.__executor = ThreadPoolExecutor(max_workers=min(AssetLoader.MAX_WORKERS, os.cpu_count() or 1))
+
+        def timedRead() -> Any:
+            start = time.perf_counter()
+            result = read()
+            AssetLoader.__timings[name] = [ time.perf_counter() - start, 0. ]
+            return result
+
+        return AssetLoader.__executor.submit(timedRead)
+
+    @staticmethod
+    def finish(name : str, future : Future, finish : Callable[[Any], Any] = None) -> Any:
+        """
+        Waits until an asset is read and finishes it on the current thread.
+
+        Args:
+            name (str): Name of the asset in the timings. The same as for submit.
+            future (Future): The future returned by submit.
+            finish (Callable[[Any], Any], optional): Gets the result of read and returns the loaded asset. If None, the result of read is the asset. Defaults to None.
+
+        Returns:
+            Any: The loaded asset.
+        """
+        result = future.result()
+        if finish is None:
+            return result
+
+        start = time.perf_counter()
+        asset = finish(result)
+        AssetLoader.__timings[name][1] = time.perf_counter() - start
+        return asset
+
+    @staticmethod
+    def loadAll(names : list[str], read : Callable[[str], Any], finish : Callable[[str, Any], Any] = None) -> dict[str, Any]:
+        """
+        Reads all assets in parallel and finishes them on the current thread as they come in.
+
+        Args:
+            names (list[str]): Names of the assets.
+            read (Callable[[str], Any]): Reads an asset by its name.
+            finish (Callable[[str, Any], Any], optional): Gets the name and the result of read and returns the loaded asset. If None, the result of read is the asset. Defaults to None.
+
+        Returns:
+            dict[str, Any]: The loaded assets by their names.
+        """
+        futures = { name: AssetLoader.submit(name, lambda name=name: read(name)) for name in names }
+        return { name: AssetLoader.finish(name, future, None if finish is None else lambda result, name=name: finish(name, result)) for name, future in futures.items() }
+
+    @staticmethod
+    def printTimings() -> None:
+        """
+        Prints how long reading and finishing took for every asset loaded so far. The slowest first.
+        """
+        timings = sorted(AssetLoader.__timings.items(), key=lambda item: sum(item[1]), reverse=True)
+
+        print(f"{'asset':<40}{'read ms':>10}{'finish ms':>11}")
+        for name, (read, finish) in timings:
+            print(f"{name:<40}{read * 1000:>10.1f}{finish * 1000:>11.1f}")
+        print(f"{'total':<40}{sum(t[0] for _, t in timings) * 1000:>10.1f}{sum(t[1] for _, t in timings) * 1000:>11.1f}")
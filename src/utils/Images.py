@@ -1,43 +1,370 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import fnmatch
+import hashlib
+import json
+import mmap
 import os
 import pygame
 import numpy as np
+import struct
+import time
 
+from utils.AssetLoader import AssetLoader
+from utils.TextureAtlas import TextureAtlas
 from utils.Transform import Transform
 
 class Images:
     """
     Static class that handles all the graphical resources.
+
+    Images are only decoded when they are needed. Every Scene declares the images it uses in its IMAGE_MANIFEST. Those are loaded before the scene is created, the images of the scenes that may come next are preloaded in the background (see preload) and images no scene needs anymore are evicted.
+    An image that is in no manifest is loaded on its first use.
+
+    Decoded images are kept as raw RGBA pixels in CACHE_FOLDER. The cache files are named by the hash of the image file, so changed images are decoded again and cache files of images that don't exist anymore are deleted.
+    The hashes are kept in CACHE_INDEX together with the modification time and size of the image files. A file is only hashed again when one of those changed.
+    The cache files are memory-mapped and read with pygame.image.frombuffer. That's a lot faster than decoding the PNG.
+
+    Images are decoded on the thread pool of the AssetLoader. Only the conversion to the pixel format of the screen happens on the main thread.
+
+    Every batch of loaded images is packed into a TextureAtlas. So there are only a few large surfaces and every image is a view into one of them. There is one shared view per image.
     """
 
     ROOT_FOLDER = "../../res/img/"
     EXTENTIONS = [ ".png", ".jpg" ]
 
-    __images : dict[str, pygame.Surface]= {}
+    PRELOAD_BUDGET_MS = 4.
+
+    CACHE_FOLDER = "../../.cache/img/"
+    CACHE_EXTENTION = ".rgba"
+    CACHE_HEADER = struct.Struct("<II") # width, height
+    CACHE_INDEX = "index.json"
+
+    __paths : dict[str, str] = {}
+    __hashes : dict[str, str] = {}
+    __views : dict[str, pygame.Surface] = {}
+    __pending : dict[str, Future] = {}
+    __numPreloads = 0
+    __preloaded : dict[str, pygame.Surface] = {}
 
     @staticmethod
-    def loadAll() -> None:
+    def indexAll() -> None:
         """
-        Loads all graphical resources.
+        Finds all graphical resources without loading them.
         
         They sould all be in the same folder: ROOT_FOLDER or its subfolders.
 
         Images that are in subfolders will be accessible via the followign format:
         eg.: ROOT_FOLDER/abc/niceImages/bla.jpg => abc.niceImages.bla
         """
+        # key => [ modification time, size, hash ] of the last start
+        index = Images.__readIndex()
+        newIndex = {}
+
         path = os.path.join(os.path.dirname(__file__), Images.ROOT_FOLDER)
         for root, _, files in os.walk(path):
             for file in files:
                 [ filename, extention ] = os.path.splitext(file)
                 if extention in Images.EXTENTIONS:
                     key = root[len(path):].replace("\\", ".").replace("/", ".") + "." + filename
-                    Images.__images[key] = pygame.image.load(os.path.join(root, file)).convert_alpha()
+                    Images.__paths[key] = os.path.join(root, file)
+
+                    stat = os.stat(Images.__paths[key])
+                    entry = index.get(key)
+                    if entry is None or entry[:2] != [ stat.st_mtime_ns, stat.st_size ]:
+                        with open(Images.__paths[key], "rb") as f:
+                            entry = [ stat.st_mtime_ns, stat.st_size, hashlib.sha1(f.read()).hexdigest() ]
+
+                    Images.__hashes[key] = entry[2]
+                    newIndex[key] = entry
+
+        if newIndex != index:
+            Images.__writeIndex(newIndex)
+
+        Images.__pruneCache()
+
+    @staticmethod
+    def __readIndex() -> dict[str, list]:
+        """
+        Reads the hashes of the image files from CACHE_INDEX.
+
+        Returns:
+            dict[str, list]: Modification time, size and hash by image key. Empty if there is no valid index.
+        """
+        try:
+            with open(os.path.join(os.path.dirname(__file__), Images.CACHE_FOLDER, Images.CACHE_INDEX)) as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def __writeIndex(index : dict[str, list]) -> None:
+        """
+        Writes the hashes of the image files to CACHE_INDEX. Nothing happens if the file can't be written.
+
+        Args:
+            index (dict[str, list]): Modification time, size and hash by image key.
+        """
+        indexFile = os.path.join(os.path.dirname(__file__), Images.CACHE_FOLDER, Images.CACHE_INDEX)
+        try:
+            os.makedirs(os.path.dirname(indexFile), exist_ok=True)
+
+            tempFile = indexFile + ".tmp"
+            with open(tempFile, "w") as f:
+                json.dump(index, f)
+            os.replace(tempFile, indexFile)
+        except OSError:
+            pass
+
+    @staticmethod
+    def __pruneCache() -> None:
+        """
+        Deletes all cache files that don't belong to a current image file.
+        """
+        folder = os.path.join(os.path.dirname(__file__), Images.CACHE_FOLDER)
+        if not os.path.isdir(folder):
+            return
+
+        current = { h + Images.CACHE_EXTENTION for h in Images.__hashes.values() } | { Images.CACHE_INDEX }
+        for file in os.listdir(folder):
+            if file not in current:
+                try:
+                    os.remove(os.path.join(folder, file))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def keys(patterns : list[str]) -> list[str]:
+        """
+        Returns the keys of all images that match at least one of the patterns.
+
+        Args:
+            patterns (list[str]): Shell-style patterns (see fnmatch). Eg.: "game.effects.*"
+
+        Returns:
+            list[str]: The matching keys.
+        """
+        return [ key for key in Images.__paths if any(fnmatch.fnmatchcase(key, pattern) for pattern in patterns) ]
+
+    @staticmethod
+    def load(patterns : list[str]) -> None:
+        """
+        Loads all images that match the patterns and aren't loaded yet. They are decoded in parallel and packed into one TextureAtlas.
+
+        Args:
+            patterns (list[str]): Shell-style patterns (see fnmatch).
+        """
+        keys = [ key for key in Images.keys(patterns) if key not in Images.__views ]
+        if len(keys) == 0:
+            return
+
+        # start all decodings that aren't running yet before waiting for any of them
+        futures = { key: Images.__pending.pop(key) if key in Images.__pending else Images.__submit(key) for key in keys if key not in Images.__preloaded }
+
+        images = { key: Images.__preloaded.pop(key) if key in Images.__preloaded else Images.__finish(key, futures[key]) for key in keys }
+
+        atlas = TextureAtlas(images)
+        for key in images:
+            Images.__views[key] = atlas.get(key)
+
+    @staticmethod
+    def preload(patterns : list[str]) -> None:
+        """
+        Starts decoding the images that match the patterns in the background. Replaces the previous queue.
+
+        Args:
+            patterns (list[str]): Shell-style patterns (see fnmatch).
+        """
+        keys = [ key for key in Images.keys(patterns) if key not in Images.__views and key not in Images.__preloaded ]
+
+        for key, future in Images.__pending.items():
+            if key not in keys:
+                future.cancel()
+
+        Images.__pending = { key: Images.__pending[key] if key in Images.__pending else Images.__submit(key) for key in keys }
+        Images.__numPreloads = len(keys)
+
+    @staticmethod
+    def preloadProgress() -> tuple[int, int]:
+        """
+        Returns how far the images queued by the last preload call are.
+
+        Returns:
+            int: How many of them are finished (see loadPending) or loaded.
+            int: How many were queued.
+        """
+        return Images.__numPreloads - len(Images.__pending), Images.__numPreloads
+
+    @staticmethod
+    def loadPending(budgetMs : float = PRELOAD_BUDGET_MS) -> None:
+        """
+        Finishes queued images (see preload) whose decoding is done until the time budget is used up. It never waits for a decoding.
+
+        Should be called once a frame. The finished images are packed when they are loaded.
+
+        Args:
+            budgetMs (float, optional): How many milliseconds may be spent. Defaults to PRELOAD_BUDGET_MS.
+        """
+        deadline = time.perf_counter() + budgetMs / 1000
+        for key, future in list(Images.__pending.items()):
+            if time.perf_counter() >= deadline:
+                break
+
+            if future.done():
+                del Images.__pending[key]
+                Images.__preloaded[key] = Images.__finish(key, future)
+
+    @staticmethod
+    def evict(keepPatterns : list[str]) -> None:
+        """
+        Forgets all loaded and preloaded images that don't match any of the patterns. 
+        
+        Their memory is freed as soon as no surface uses them anymore. An atlas is only freed when all its images are unused.
+
+        Args:
+            keepPatterns (list[str]): Shell-style patterns (see fnmatch) of the images that should be kept.
+        """
+        keep = set(Images.keys(keepPatterns))
+        Images.__views = { key: view for key, view in Images.__views.items() if key in keep }
+        Images.__preloaded = { key: image for key, image in Images.__preloaded.items() if key in keep }
+
+    @staticmethod
+    def isLoaded(imageKey : str) -> bool:
+        """
+        Checks if an image is loaded.
+
+        Args:
+            imageKey (str): The key of the image.
+
+        Returns:
+            bool: If the image is loaded.
+        """
+        return imageKey in Images.__views
+
+    @staticmethod
+    def __submit(imageKey : str) -> Future:
+        """
+        Starts decoding an image on the thread pool of the AssetLoader.
+
+        Args:
+            imageKey (str): The key of the image.
+
+        Returns:
+            Future: Will hold the result of __read.
+        """
+        return AssetLoader.submit(imageKey, lambda: Images.__read(imageKey))
+
+    @staticmethod
+    def __finish(imageKey : str, future : Future) -> pygame.Surface:
+        """
+        Waits for a decoded image and converts it to the pixel format of the screen. Has to run on the main thread.
+
+        If it wasn't cached yet, it is cached afterwards.
+
+        Args:
+            imageKey (str): The key of the image.
+            future (Future): The future returned by __submit.
+
+        Returns:
+            pygame.Surface: The decoded image in the pixel format of the screen.
+        """
+        def convert(result : tuple[pygame.Surface, bool]) -> pygame.Surface:
+            raw, cached = result
+            image = raw.convert_alpha()
+            if not cached:
+                Images.__writeCache(Images.__cacheFile(imageKey), image)
+            return image
+
+        return AssetLoader.finish(imageKey, future, convert)
+
+    @staticmethod
+    def __read(imageKey : str) -> tuple[pygame.Surface, bool]:
+        """
+        Reads an image from the cache or, if it isn't cached yet, from its file. Can run on any thread.
+
+        Args:
+            imageKey (str): The key of the image.
+
+        Returns:
+            pygame.Surface: The image. Not converted yet.
+            bool: If it was read from the cache.
+        """
+        raw = Images.__readCache(Images.__cacheFile(imageKey))
+        if raw is not None:
+            return raw, True
+
+        return pygame.image.load(Images.__paths[imageKey]), False
+
+    @staticmethod
+    def __cacheFile(imageKey : str) -> str:
+        """
+        Returns the path of the cache file of an image.
+
+        Args:
+            imageKey (str): The key of the image.
+
+        Returns:
+            str: The path.
+        """
+        return os.path.join(os.path.dirname(__file__), Images.CACHE_FOLDER, Images.__hashes[imageKey] + Images.CACHE_EXTENTION)
+
+    @staticmethod
+    def __readCache(cacheFile : str) -> pygame.Surface | None:
+        """
+        Reads the raw pixels of an image from a cache file.
+
+        The returned surface uses the memory-mapped file directly. The mapping is closed when the surface is gone.
+
+        Args:
+            cacheFile (str): Path of the cache file.
+
+        Returns:
+            pygame.Surface: The image in RGBA format. Or:
+            None: If there is no valid cache file.
+        """
+        try:
+            with open(cacheFile, "rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            width, height = Images.CACHE_HEADER.unpack_from(m)
+            if len(m) != Images.CACHE_HEADER.size + width * height * 4:
+                m.close()
+                return None
+
+            return pygame.image.frombuffer(memoryview(m)[Images.CACHE_HEADER.size:], (width, height), "RGBA")
+        except (OSError, ValueError, struct.error):
+            return None
+
+    @staticmethod
+    def __writeCache(cacheFile : str, image : pygame.Surface) -> None:
+        """
+        Writes the raw pixels of an image to a cache file. Nothing happens if the file can't be written.
+
+        Args:
+            cacheFile (str): Path of the cache file.
+            image (pygame.Surface): The image.
+        """
+        try:
+            os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+
+            # write to a temporary file first, so a cache file is either complete or missing
+            tempFile = cacheFile + ".tmp"
+            with open(tempFile, "wb") as f:
+                f.write(Images.CACHE_HEADER.pack(*image.get_size()))
+                f.write(pygame.image.tobytes(image, "RGBA"))
+            os.replace(tempFile, cacheFile)
+        except OSError:
+            pass
     
     @staticmethod
     def get(imageKey : str) -> pygame.Surface:
         """
-        Gets an image resource as pygame.Surface by its key.
+        Gets an image resource as pygame.Surface by its key. It is loaded if it isn't yet.
 
-        For the key's structure see Images.loadAll()
+        For the key's structure see Images.indexAll()
+
+        The surface is a view into an atlas and shared by everyone who gets the same image. It must not be changed, not even its alpha value. See Sprite.setAlpha.
 
         Args:
             imageKey (str): The key of the image.
@@ -45,7 +372,10 @@ class Images:
         Returns:
             pygame.Surface: The resulting surface.
         """
-        return Images.__images[imageKey].copy()
+        if imageKey not in Images.__views:
+            Images.load([ imageKey ])
+
+        return Images.__views[imageKey]
     
 
 class Sprite:
@@ -53,8 +383,20 @@ class Sprite:
     Represents a sprite.
 
     A sprite is basically an image with a Transform. So it can be directly drawn to the screen at the correct position.
+
+    Its untransformed image is shared with other sprites. So the alpha value may only be changed via setAlpha.
+
+    Sprites that scale or rotate every frame share a cache of transformed surfaces. The scale is rounded to SCALE_STEP and the angle to ANGLE_STEP degrees, so animations keep hitting surfaces that were already calculated.
+    The cache holds the last TRANSFORM_CACHE_SIZE surfaces.
     """
 
+    TRANSFORM_CACHE_SIZE = 128
+    SCALE_STEP = 0.01
+    ANGLE_STEP = 2.
+
+    # (id of the image, flip x, flip y, scale steps x, scale steps y, angle steps) => (image, transformed surface)
+    __transformCache : OrderedDict[tuple, tuple[pygame.Surface, pygame.Surface]] = OrderedDict()
+
     def __init__(self, image : str | pygame.Surface, transform : Transform = None, enableScaling : bool = False, enableRotation : bool = False, bakeNow : bool = False):
         """
         The constructor of the Sprite class.
@@ -70,7 +412,7 @@ class Sprite:
             bakeNow (bool, optional): Determines whether the inital transform should be baked into the Sprite imediately. For details see bakeTransform. Defaults to False.
         """
         self.image : pygame.Surface = Images.get(image) if isinstance(image, str) else image
-        self.untransformedImage = self.image.copy()
+        self.untransformedImage = self.image
         self.transform : Transform  = Transform.fromTransform(transform)
         self.enableScaling : bool   = enableScaling
         self.enableRoation : bool   = enableRotation
@@ -90,7 +432,7 @@ class Sprite:
             includeScale (bool, optional): Whether the scale should be considered baking. Defaults to True.
             includeRotation (bool, optional): Whether the rotation angle should be considered baking. Defaults to True.
         """
-        self.image = self.untransformedImage.copy()
+        self.image = self.untransformedImage
         if includeScale:
             scale = self.transform.getScale()
             self.image = pygame.transform.flip(self.image, scale[0] < 0, scale[1] < 0)
@@ -106,20 +448,72 @@ class Sprite:
 
         img = self.image
 
+        if self.enableScaling or self.enableRoation:
+            img = self.__transformed()
+
+        rect = img.get_rect(center=self.transform.getPosition())
+        screen.blit(img, rect)
+
+    def __transformed(self) -> pygame.Surface:
+        """
+        Returns the image with the current scale and / or rotation applied. See the transform cache in the class description.
+
+        Returns:
+            pygame.Surface: The transformed image.
+        """
+        flipX, flipY, scaleSteps, angleSteps = False, False, (0, 0), 0
+
         if self.enableScaling:
             scale = self.transform.getScale()
-            img = pygame.transform.flip(img, scale[0] < 0, scale[1] < 0)
-            img = pygame.transform.scale(img, np.absolute(scale) * np.array(self.image.get_size()))
-        
+            flipX, flipY = bool(scale[0] < 0), bool(scale[1] < 0)
+            scaleSteps = (round(abs(scale[0]) / Sprite.SCALE_STEP), round(abs(scale[1]) / Sprite.SCALE_STEP))
 
         if self.enableRoation:
-            img = pygame.transform.rotate(img, np.degrees(self.transform.getAngle()))
+            angleSteps = round(np.degrees(self.transform.getAngle()) / Sprite.ANGLE_STEP) % round(360 / Sprite.ANGLE_STEP)
 
-        rect = img.get_rect(center=self.transform.getPosition())
-        screen.blit(img, rect)
+        key = (id(self.image), flipX, flipY, scaleSteps, angleSteps)
+        cache = Sprite.__transformCache
+        cached = cache.get(key)
+
+        # the id of a freed image can be reused, so the image itself is compared too
+        if cached is not None and cached[0] is self.image:
+            cache.move_to_end(key)
+            img = cached[1]
+            if img.get_alpha() != self.image.get_alpha():
+                img.set_alpha(self.image.get_alpha())
+            return img
+
+        img = self.image
+        if self.enableScaling:
+            img = pygame.transform.flip(img, flipX, flipY)
+            img = pygame.transform.scale(img, (round(scaleSteps[0] * Sprite.SCALE_STEP * img.get_width()), round(scaleSteps[1] * Sprite.SCALE_STEP * img.get_height())))
+
+        if self.enableRoation and angleSteps != 0:
+            img = pygame.transform.rotate(img, angleSteps * Sprite.ANGLE_STEP)
+
+        cache[key] = (self.image, img)
+        if len(cache) > Sprite.TRANSFORM_CACHE_SIZE:
+            cache.popitem(last=False)
+
+        return img
     
     def unbake(self) -> None:
         """
         Removes any baked transforms from the sprite.
         """
-        self.image = self.untransformedImage.copy()
+        self.image = self.untransformedImage
+
+    def setAlpha(self, alpha : float) -> None:
+        """
+        Sets the alpha value of the sprite's image.
+
+        The untransformed image is shared with other sprites. So before its alpha is changed, the sprite gets a private view of it. The view shares the pixels, only the alpha value is its own.
+        Baking or unbaking the transform resets the alpha value.
+
+        Args:
+            alpha (float): The new alpha value between 0 and 255.
+        """
+        if self.image is self.untransformedImage:
+            self.image = self.image.subsurface(self.image.get_rect())
+
+        self.image.set_alpha(alpha)
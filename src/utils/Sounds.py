@@ -1,24 +1,47 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
 import os
 import pygame
+import zlib
+
+from utils.AssetLoader import AssetLoader
 
 class Sounds:
     """
     Static class that handles all the sound resources.
+
+    Sound effects can be loaded all at once (loadAll) or in the background (preloadAll). A sound effect that is played before it is loaded is loaded right away.
+
+    Sound effects that take more than LARGE_SOUND_BYTES in the format of the mixer are only kept compressed in memory (unless COMPRESS_LARGE_SOUNDS is off). They are decoded when they are played.
+    The last MAX_DECODED_SOUNDS decoded ones are cached. That is enough for the three effects of a shot (cannon, splash and explosion) plus one cue like the ship horn, so a shot never decodes on the main thread. Sound effects that can be predicted should be decoded in advance, see preload.
+    MAX_DECODED_SOUNDS is a soft limit: sound effects that are still playing are never dropped, so the cache can hold more while they play. It shrinks back once they are done, see loadPending.
+    A large sound effect that is loaded because it is played right away goes into that cache without being compressed. It is only compressed in the background once it is dropped from the cache.
     """
 
     SOUND_EFFECT_FOLDER = "../../res/music/sounds/"
     MUSIC_FOLDER = "../../res/music/music/"
     EXTENTIONS = [ ".wav" ]
 
+    COMPRESS_LARGE_SOUNDS = True
+    LARGE_SOUND_BYTES = 256 * 1024
+    COMPRESSION_LEVEL = 1
+    MAX_DECODED_SOUNDS = 4
+
+    __paths : dict[str, str] = {}
     __soundEffects : dict[str, pygame.mixer.Sound] = {}
+    __compressed : dict[str, bytes] = {}
+    __decoded : OrderedDict[str, pygame.mixer.Sound] = OrderedDict()
+    __pending : dict[str, Future] = {}
+    __decoding : dict[str, Future] = {}
 
     __musicOn  = True
     __soundsOn = True
 
     @staticmethod
-    def loadAll() -> None:
+    def indexAll() -> None:
         """
-        Loads all sound effect resources.
+        Finds all sound effect resources without loading them.
         
         They sould all be in the same folder: SOUND_EFFECT_FOLDER.
 
@@ -30,8 +53,265 @@ class Sounds:
                 [ filename, extention ] = os.path.splitext(file)
                 if extention in Sounds.EXTENTIONS:
                     key = filename
-                    Sounds.__soundEffects[key] = pygame.mixer.Sound(os.path.join(root, file))
-                    
+                    Sounds.__paths[key] = os.path.join(root, file)
+
+    @staticmethod
+    def loadAll() -> None:
+        """
+        Finds and loads all sound effect resources that aren't loaded yet. See indexAll.
+
+        The files are decoded in parallel on the thread pool of the AssetLoader.
+        """
+        Sounds.indexAll()
+
+        for key in list(Sounds.__pending):
+            Sounds.__takeOver(key)
+
+        keys = [ key for key in Sounds.__paths if not Sounds.__isLoaded(key) ]
+        for key, sound in AssetLoader.loadAll(keys, Sounds.__read).items():
+            Sounds.__store(key, sound)
+
+    @staticmethod
+    def preloadAll() -> None:
+        """
+        Starts loading all sound effect resources in the background. See loadPending.
+        """
+        for key in Sounds.__paths:
+            if not Sounds.__isLoaded(key) and key not in Sounds.__pending:
+                Sounds.__pending[key] = AssetLoader.submit(key, lambda key=key: Sounds.__read(key))
+
+    @staticmethod
+    def preload(name : str) -> None:
+        """
+        Starts decoding a large sound effect in the background, so it is ready when it is played shortly after. Small sound effects are always ready.
+
+        Args:
+            name (str): The name of the sound.
+        """
+        if name in Sounds.__decoded:
+            Sounds.__decoded.move_to_end(name)
+        elif name in Sounds.__compressed and name not in Sounds.__decoding:
+            Sounds.__decoding[name] = AssetLoader.submit(name, lambda: Sounds.__decompress(Sounds.__compressed[name]))
+
+    @staticmethod
+    def loadPending() -> None:
+        """
+        Takes over the sound effects that were loaded or decoded in the background in the meantime. It never waits.
+        Also drops decoded sound effects that were kept over MAX_DECODED_SOUNDS only because they were playing.
+
+        Should be called once a frame.
+        """
+        for key, future in list(Sounds.__pending.items()):
+            if future.done():
+                Sounds.__takeOver(key)
+
+        for key, future in list(Sounds.__decoding.items()):
+            if future.done():
+                Sounds.__remember(key, AssetLoader.finish(key, Sounds.__decoding.pop(key)))
+
+        if len(Sounds.__decoded) > Sounds.MAX_DECODED_SOUNDS:
+            Sounds.__trim()
+
+    @staticmethod
+    def loadProgress() -> tuple[int, int]:
+        """
+        Returns how many sound effects are loaded.
+
+        Returns:
+            int: How many sound effects are loaded.
+            int: How many sound effects there are.
+        """
+        return len(Sounds.__soundEffects.keys() | Sounds.__compressed.keys() | Sounds.__decoded.keys()), len(Sounds.__paths)
+
+    @staticmethod
+    def __isLoaded(name : str) -> bool:
+        """
+        Checks if a sound effect is loaded. Compressed, decoded or both.
+
+        Args:
+            name (str): The name of the sound.
+
+        Returns:
+            bool: If the sound effect is loaded.
+        """
+        return name in Sounds.__soundEffects or name in Sounds.__compressed or name in Sounds.__decoded
+
+    @staticmethod
+    def __read(name : str, compress : bool = True) -> pygame.mixer.Sound | bytes:
+        """
+        Loads a sound effect from its file. Large ones are compressed (see __compress). Can run on any thread.
+
+        Args:
+            name (str): The name of the sound.
+            compress (bool, optional): If large sound effects are compressed. Defaults to True.
+
+        Returns:
+            pygame.mixer.Sound: The sound effect. Or:
+            bytes: Its compressed samples if it is large.
+        """
+        sound = pygame.mixer.Sound(Sounds.__paths[name])
+        if not compress or not Sounds.__isLarge(sound):
+            return sound
+
+        return Sounds.__compress(sound.get_raw())
+
+    @staticmethod
+    def __isLarge(sound : pygame.mixer.Sound) -> bool:
+        """
+        Checks if a sound effect is only kept compressed in memory.
+
+        Args:
+            sound (pygame.mixer.Sound): The sound effect.
+
+        Returns:
+            bool: If the sound effect is large and COMPRESS_LARGE_SOUNDS is on.
+        """
+        return Sounds.COMPRESS_LARGE_SOUNDS and sound.get_length() * Sounds.__bytesPerSecond() > Sounds.LARGE_SOUND_BYTES
+
+    @staticmethod
+    def __store(name : str, sound : pygame.mixer.Sound | bytes) -> None:
+        """
+        Keeps a loaded sound effect.
+
+        Args:
+            name (str): The name of the sound.
+            sound (pygame.mixer.Sound | bytes): The result of __read.
+        """
+        if isinstance(sound, bytes):
+            Sounds.__compressed[name] = sound
+        else:
+            Sounds.__soundEffects[name] = sound
+
+    @staticmethod
+    def __takeOver(name : str) -> None:
+        """
+        Waits for a sound effect that is loaded in the background and keeps it.
+
+        Args:
+            name (str): The name of the sound.
+        """
+        Sounds.__store(name, AssetLoader.finish(name, Sounds.__pending.pop(name)))
+
+    @staticmethod
+    def __remember(name : str, sound : pygame.mixer.Sound) -> None:
+        """
+        Puts a decoded large sound effect in the cache. See __trim.
+
+        Args:
+            name (str): The name of the sound.
+            sound (pygame.mixer.Sound): The decoded sound effect.
+        """
+        Sounds.__decoded[name] = sound
+        Sounds.__decoded.move_to_end(name)
+        Sounds.__trim(name)
+
+    @staticmethod
+    def __trim(keep : str = None) -> None:
+        """
+        Drops the least recently used decoded sound effects until there are at most MAX_DECODED_SOUNDS, unless they are playing.
+        Dropped ones that were never compressed are compressed in the background first. See loadPending.
+
+        Args:
+            keep (str, optional): Name of a sound effect that mustn't be dropped. Defaults to None.
+        """
+        while len(Sounds.__decoded) > Sounds.MAX_DECODED_SOUNDS:
+            unused = next((key for key, s in Sounds.__decoded.items() if key != keep and s.get_num_channels() == 0), None)
+            if unused is None:
+                break
+            dropped = Sounds.__decoded.pop(unused)
+            if unused not in Sounds.__compressed:
+                Sounds.__pending[unused] = AssetLoader.submit(unused, lambda dropped=dropped: Sounds.__compress(dropped.get_raw()))
+
+    @staticmethod
+    def __get(name : str) -> pygame.mixer.Sound:
+        """
+        Returns a sound effect that is ready to play.
+
+        If it isn't loaded yet, it is loaded now. Or, if it is loaded in the background, it is waited for. Large sound effects are decoded if they aren't in the cache.
+        A large sound effect that is loaded now isn't compressed, it goes straight into the cache.
+
+        Args:
+            name (str): The name of the sound.
+
+        Returns:
+            pygame.mixer.Sound: The sound effect.
+        """
+        if name in Sounds.__pending:
+            Sounds.__takeOver(name)
+
+        if not Sounds.__isLoaded(name):
+            sound = AssetLoader.loadAll([ name ], lambda name: Sounds.__read(name, False))[name]
+            if not Sounds.__isLarge(sound):
+                Sounds.__store(name, sound)
+            else:
+                Sounds.__remember(name, sound)
+
+        if name in Sounds.__soundEffects:
+            return Sounds.__soundEffects[name]
+
+        if name in Sounds.__decoded:
+            Sounds.__decoded.move_to_end(name)
+            return Sounds.__decoded[name]
+
+        if name in Sounds.__decoding:
+            sound = AssetLoader.finish(name, Sounds.__decoding.pop(name))
+        else:
+            sound = Sounds.__decompress(Sounds.__compressed[name])
+
+        Sounds.__remember(name, sound)
+        return sound
+
+    @staticmethod
+    def __compress(samples : bytes) -> bytes:
+        """
+        Compresses samples in the format of the mixer losslessly.
+
+        16 bit samples are stored as the difference to the previous sample of the same channel first. That makes them compress a lot better.
+
+        Args:
+            samples (bytes): The raw samples.
+
+        Returns:
+            bytes: The compressed samples.
+        """
+        _, size, channels = pygame.mixer.get_init()
+        if size == -16:
+            pcm = np.frombuffer(samples, dtype=np.int16).reshape(-1, channels)
+            samples = np.diff(pcm, axis=0, prepend=np.zeros((1, channels), dtype=np.int16)).tobytes()
+
+        return zlib.compress(samples, Sounds.COMPRESSION_LEVEL)
+
+    @staticmethod
+    def __decompress(data : bytes) -> pygame.mixer.Sound:
+        """
+        Turns compressed samples (see __compress) back into a sound effect. Can run on any thread.
+
+        Args:
+            data (bytes): The compressed samples.
+
+        Returns:
+            pygame.mixer.Sound: The sound effect.
+        """
+        samples = zlib.decompress(data)
+
+        _, size, channels = pygame.mixer.get_init()
+        if size == -16:
+            # the sum wraps around just like the differences did
+            differences = np.frombuffer(samples, dtype=np.int16).reshape(-1, channels)
+            samples = np.cumsum(differences, axis=0, dtype=np.int16).tobytes()
+
+        return pygame.mixer.Sound(buffer=samples)
+
+    @staticmethod
+    def __bytesPerSecond() -> int:
+        """
+        Returns how many bytes one second of sound takes in the format of the mixer.
+
+        Returns:
+            int: The bytes per second.
+        """
+        frequency, size, channels = pygame.mixer.get_init()
+        return frequency * abs(size) // 8 * channels
     
     @staticmethod
     def playSoundEffect(name : str) -> None:
@@ -44,7 +324,7 @@ class Sounds:
             name (str): The name of the sound to be played.
         """
         if Sounds.__soundsOn:
-            Sounds.__soundEffects[name].play()
+            Sounds.__get(name).play()
 
     
     @staticmethod
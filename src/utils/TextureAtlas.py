@@ -0,0 +1,115 @@
+import pygame
+
+
+class TextureAtlas:
+    """
+    Packs many images into a few large surfaces (pages) and hands out subsurface views of them.
+
+    The images are sorted by height and placed next to each other on shelves: rows as high as their first (highest) image. A new shelf is opened below the last one when an image doesn't fit on any shelf and a new page when there is no room for another shelf.
+    Images wider or higher than MAX_PACKED_SIZE are not copied, they become a page of their own. So does an image that ends up alone on a page.
+    """
+
+    PAGE_SIZE = 2048
+    MAX_PACKED_SIZE = 1024
+
+    def __init__(self, images : dict[str, pygame.Surface], pageSize : int = PAGE_SIZE):
+        """
+        Constructor of the TextureAtlas class. Packs the images right away.
+
+        Args:
+            images (dict[str, pygame.Surface]): The images to pack by their keys. They all should have the same pixel format (eg. convert_alpha).
+            pageSize (int, optional): Width and maximum height of a page in pixels. Defaults to PAGE_SIZE.
+        """
+        self.pageSize = pageSize
+        self.pages : list[pygame.Surface] = []
+        self.__rects : dict[str, tuple[int, pygame.Rect]] = {}
+
+        packed = {}
+        for key, image in images.items():
+            if image.get_width() > TextureAtlas.MAX_PACKED_SIZE or image.get_height() > TextureAtlas.MAX_PACKED_SIZE:
+                self.__rects[key] = (len(self.pages), image.get_rect())
+                self.pages.append(image)
+            else:
+                packed[key] = image
+
+        self.__pack(packed)
+
+    def __pack(self, images : dict[str, pygame.Surface]) -> None:
+        """
+        Places the images on shelves and copies them into new pages.
+
+        Args:
+            images (dict[str, pygame.Surface]): The images to pack by their keys.
+        """
+        # a shelf is [ y, height, used width ]. Every page has its own list of shelves
+        pageShelves : list[list[list[int]]] = []
+        firstPage = len(self.pages)
+
+        for key in sorted(images, key=lambda k: images[k].get_height(), reverse=True):
+            width, height = images[key].get_size()
+            place = None
+
+            for pageIndex, shelves in enumerate(pageShelves):
+                for shelf in shelves:
+                    if height <= shelf[1] and shelf[2] + width <= self.pageSize:
+                        place = (pageIndex, shelf)
+                        break
+                if place is not None:
+                    break
+
+            if place is None:
+                for pageIndex, shelves in enumerate(pageShelves):
+                    top = shelves[-1][0] + shelves[-1][1]
+                    if top + height <= self.pageSize:
+                        shelves.append([ top, height, 0 ])
+                        place = (pageIndex, shelves[-1])
+                        break
+
+            if place is None:
+                pageShelves.append([[ 0, height, 0 ]])
+                place = (len(pageShelves) - 1, pageShelves[-1][0])
+
+            pageIndex, shelf = place
+            self.__rects[key] = (firstPage + pageIndex, pygame.Rect(shelf[2], shelf[0], width, height))
+            shelf[2] += width
+
+        keysByPage : list[list[str]] = [ [] for _ in pageShelves ]
+        for key in images:
+            keysByPage[self.__rects[key][0] - firstPage].append(key)
+
+        # the pages are only as large as their shelves. A page with a single image is the image itself
+        for shelves, keys in zip(pageShelves, keysByPage):
+            if len(keys) == 1:
+                self.pages.append(images[keys[0]])
+                continue
+
+            page = pygame.Surface((max(shelf[2] for shelf in shelves), shelves[-1][0] + shelves[-1][1]), pygame.SRCALPHA, images[keys[0]])
+            for key in keys:
+                # max-blending onto the empty page copies the pixels including their alpha
+                page.blit(images[key], self.__rects[key][1], special_flags=pygame.BLEND_RGBA_MAX)
+            self.pages.append(page)
+
+    def __contains__(self, key : str) -> bool:
+        return key in self.__rects
+
+    def keys(self) -> list[str]:
+        """
+        Returns the keys of all images in the atlas.
+
+        Returns:
+            list[str]: The keys.
+        """
+        return list(self.__rects)
+
+    def get(self, key : str) -> pygame.Surface:
+        """
+        Returns a new subsurface view of an image. It shares the pixels with the atlas but has its own alpha value.
+
+        Args:
+            key (str): The key of the image.
+
+        Returns:
+            pygame.Surface: The view of the image.
+        """
+        page, rect = self.__rects[key]
+        return self.pages[page].subsurface(rect)
@@ -2,6 +2,8 @@ from utils.InstanceRegistryMetaClass import InstanceRegistryMetaClass
 from utils.Animator import Animator
 from utils.Timer import Timer
 from utils.Transform import Transform
+from utils.AssetLoader import AssetLoader
+from utils.TextureAtlas import TextureAtlas
 from utils.Images import Images, Sprite
 from utils.Sounds import Sounds
 from utils.Input import Input
\ No newline at end of file